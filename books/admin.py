@@ -1,13 +1,52 @@
-from typing import Sequence
-from django.contrib import admin
-from django.contrib.admin.views.main import ChangeList
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Sequence, Union
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList, SEARCH_VAR
 from django.utils.functional import cached_property
 from django.core.paginator import Paginator
-from django.db import connection
+from django.db import DEFAULT_DB_ALIAS, connections, router, OperationalError
 from django.core.paginator import InvalidPage
-from django.contrib.admin.options import IncorrectLookupParameters
-from .models import Book, Author
-from .utils import get_field_verbose_names, get_field_names
+from django.contrib.admin.models import LogEntry, CHANGE, DELETION
+from django.contrib.admin.options import IncorrectLookupParameters, get_content_type_for_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.exceptions import (
+    FieldDoesNotExist, ImproperlyConfigured, PermissionDenied, SuspiciousOperation, ValidationError
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_save, post_delete
+from django.http import Http404, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.template.response import SimpleTemplateResponse, TemplateResponse
+from django.urls import path, reverse
+from django.utils.translation import gettext as _, ngettext
+from .async_db import fetch_all
+from .bulk import bulk_delete, bulk_update
+from .cache import make_cache_key, make_digest, get_model_version, invalidate_on_write
+from .executor import submit_query, submit_background
+from .filters import get_bounded_list_filter
+from .export import EXPORT_FORMATS, stream_rows
+from .forms import BulkActionForm
+from .jobs import get_recent_jobs, start_job
+from .models import Book, Author, Job
+from .routing import select_database
+from .utils import (
+    get_field_verbose_names, get_field_names, get_search_expression, get_lookup_path, get_related_models,
+    get_search_kind, get_search_vector_column, parse_number_range, parse_date_range, escape_like, encode_cursor,
+    decode_cursor, statement_timeout, is_query_canceled
+)
+
+CURSOR_VAR = 'c'
+EXPORT_FORMAT_VAR = 'format'
+ALL_FIELDS = 'all'  # the `mf` value that searches every search field at once
+
+logger = logging.getLogger(__name__)
 
 
 class SearchOnlyChangeList(ChangeList):
@@ -19,8 +58,26 @@ class SearchOnlyChangeList(ChangeList):
 
     def __init__(self, *args, **kwargs):
         self.search_result_count = 0
+        self.search_result_count_exact = True
+        self.search_result_count_available = True
+        self.count_future = None
+        self.lookup_field = self.searched_data = self.order_code = None
+        self.page_sql, self.page_params = '', []
+        self.timings = {}
+        self.started = perf_counter()
+        self.explain = None
+        self.page_cache_hit = False
+        self.cursor = self.cursor_search = self.cursor_ordering = None
+        self.next_cursor = self.prev_cursor = None
+        # the database of every search query, see `get_queryset`
+        self.search_db = DEFAULT_DB_ALIAS
+        self.filter_sql, self.filter_sql_params = '', []
+        self.filter_models = []
         super().__init__(*args, **kwargs)
-        self.lookup_field = None
+
+    @property
+    def keyset_pagination(self) -> bool:
+        return self.model_admin.pagination_mode == 'keyset'
 
     @property
     def related_fields(self):
@@ -29,13 +86,25 @@ class SearchOnlyChangeList(ChangeList):
         ]
 
     @staticmethod
-    def get_join_clause(seq: Sequence):
+    def get_join_clause(paths: Sequence, clause: str) -> str:
         """
-        param seq: sequence of related fields to join
-        e.g. 
-        >>> get_join_clause([''])
+        param `paths`: the `PathInfo`s from the searched model to the related one
+        param `clause`: the search predicate on the table at the end of `paths`
+        wraps the predicate into one semi-join per relation, innermost first.
+        Postgres filters the related table first (using its own index) and only then
+        looks up the matching rows of the big table, instead of joining all of it.
+
+        e.g. for `author__name` on `Book`:
+        >>> get_join_clause(paths, "LOWER(books_author.name::text) LIKE LOWER(%s::text) ")
+        >>> 'books_book.author_id IN (SELECT books_author.id FROM books_author
+             WHERE LOWER(books_author.name::text) LIKE LOWER(%s::text) ) '
         """
-        return ' '.join('JOIN ')
+        for path in reversed(paths):
+            (lhs, rhs), = path.join_field.get_joining_columns()
+            from_table = path.from_opts.db_table
+            to_table = path.to_opts.db_table
+            clause = f"{from_table}.{lhs} IN (SELECT {to_table}.{rhs} FROM {to_table} WHERE {clause}) "
+        return clause
 
     @property
     def all_fields(self):
@@ -73,10 +142,8 @@ class SearchOnlyChangeList(ChangeList):
         ```
         """
 
-        table = self.opts.db_table
         search_fields = self.search_fields
-        q = [
-            f"LOWER({table}.{i}::text) LIKE LOWER(%s::text) " for i in search_fields]
+        q = [self.get_search_clause(i) for i in search_fields]
         # Using LIKE was more efficient than ILIKE in the benchmark
         # Use of lower-casing along with  `LIKE` was a more efficient way than using `ILIKE`
         length = len(q)
@@ -85,9 +152,223 @@ class SearchOnlyChangeList(ChangeList):
                 q[i] += delim + ' '
         return ''.join(q)
 
+    def get_match_mode(self, field: str) -> str:
+        """
+        returns how a text field is matched: `contains` (default), `prefix`, `exact` or `fulltext`.
+        It is set per search field with `search_match_modes` on the model admin.
+        """
+        return self.model_admin.search_match_modes.get(field, 'contains')
+
+    def get_field_predicate(self, lookup: str, field, table: str) -> str:
+        """
+        returns the predicate that `field` of `table` is searched with, chosen by the field type.
+        Numbers and dates get equality or range predicates that a B-tree index can serve,
+        text fields are matched on the expression that the trigram indexes are built on.
+        The values of the placeholders come from `get_search_params`.
+        """
+        column = f'{table}.{field.column}'
+        kind = get_search_kind(field)
+        if kind == 'integer':
+            return f"{column} = %s "
+        if kind == 'number':
+            # the range is closed at the typed number, at its start or at its end, see `parse_number_range`
+            return f"({column} = %s OR ({column} > %s AND {column} < %s)) "
+        if kind == 'date':
+            return f"({column} >= %s AND {column} < %s) "
+        if kind == 'text' and self.get_match_mode(lookup) == 'fulltext':
+            vector = f'{table}.{get_search_vector_column(field.column)}'
+            return f"{vector} @@ websearch_to_tsquery('{self.model_admin.fulltext_config}', %s) "
+        if kind == 'text' and self.get_match_mode(lookup) == 'exact':
+            return f"{get_search_expression(field.column, table)} = LOWER(%s::text) "
+        return f"{get_search_expression(field.column, table)} LIKE LOWER(%s::text) "
+
+    def get_search_params(self, lookup: str, searched_data: str) -> list:
+        """
+        returns the parameters of the predicate of `get_search_clause(lookup)`.
+        A value that does not fit the field type (e.g. `abc` for an integer field)
+        becomes NULL, which matches nothing.
+        """
+        _, field = get_lookup_path(self.model, lookup)
+        kind = get_search_kind(field)
+        if kind == 'integer':
+            try:
+                return [int(searched_data.strip())]
+            except ValueError:
+                return [None]
+        if kind == 'number':
+            number_range = parse_number_range(searched_data)
+            if number_range is None:
+                return [None, None, None]
+            low, high = number_range
+            return [high if low < 0 else low, low, high]
+        if kind == 'date':
+            return list(parse_date_range(searched_data) or (None, None))
+
+        mode = self.get_match_mode(lookup) if kind == 'text' else 'contains'
+        if mode in ('exact', 'fulltext'):
+            return [searched_data]
+        searched_data = escape_like(searched_data)
+        return [{
+            'prefix': f'{searched_data}%',
+            'contains': f'%{searched_data}%',
+        }[mode]]
+
     def get_search_clause(self, field):
+        """
+        The text predicates repeat exactly the expression that the trigram indexes of the
+        `create_search_indexes` command are built on, so postgres can serve them
+        with a bitmap index scan instead of a sequential scan.
+        Lookups that span relations (`author__name`) are searched with semi-joins.
+        """
+        paths, target = get_lookup_path(self.model, field)
+        clause = self.get_field_predicate(field, target, target.model._meta.db_table)
+        if paths:
+            return self.get_join_clause(paths, clause)
+        return clause
+
+    def get_union_fields(self, searched_data: str) -> list[str]:
+        """
+        returns the search fields that an `ALL_FIELDS` search runs on. A field whose type
+        the value does not fit (e.g. `abc` for a number) would only match NULL and is left out.
+        """
+        return [
+            i for i in self.search_fields
+            if any(param is not None for param in self.get_search_params(i, searched_data))
+        ]
+
+    def get_union_clause(self, searched_data: str) -> str:
+        """
+        An `ALL_FIELDS` search ORed over the fields (see `get_sql_searchparams`) cannot use
+        any index once a semi-join is among its predicates, so postgres scans the whole table.
+        Instead every field is searched by a subquery of its own, which its own index serves,
+        and `UNION` merges their primary keys without duplicates. The outer query then
+        orders, limits or counts the merged rows once.
+
+        e.g. for `title` and `author__name` on `Book`:
+        >>> 'books_book.id IN (SELECT books_book.id FROM books_book WHERE LOWER(books_book.title::text) LIKE ...
+             UNION SELECT books_book.id FROM books_book WHERE books_book.author_id IN (SELECT ...)) '
+        """
         table = self.opts.db_table
-        return f"LOWER({table}.{field}::text) LIKE LOWER(%s::text) "
+        pk = f'{table}.{self.opts.pk.column}'
+        subqueries = [
+            f"SELECT {pk} FROM {table} WHERE {self.get_search_clause(i)}"
+            for i in self.get_union_fields(searched_data)
+        ]
+        if not subqueries:
+            return 'FALSE '
+        return f"{pk} IN ({' UNION '.join(subqueries)}) "
+
+    def get_where_clause(self, searched_data: str) -> str:
+        """
+        returns the predicate of the search of `lookup_field`, one field or `ALL_FIELDS`,
+        and of the active list filters
+        """
+        if self.lookup_field == ALL_FIELDS:
+            clause = self.get_union_clause(searched_data)
+        else:
+            clause = self.get_search_clause(self.lookup_field)
+        if self.filter_sql:
+            clause += f"AND {self.filter_sql} "
+        return clause
+
+    def get_where_params(self, searched_data: str) -> list:
+        """returns the parameters of `get_where_clause`"""
+        if self.lookup_field != ALL_FIELDS:
+            params = self.get_search_params(self.lookup_field, searched_data)
+        else:
+            params = []
+            for field in self.get_union_fields(searched_data):
+                params += self.get_search_params(field, searched_data)
+        return params + self.filter_sql_params
+
+    def get_filters_params(self, params=None):
+        """leaves the parameters of this changelist out of the list filter lookups"""
+        lookup_params = super().get_filters_params(params)
+        for name in ('mf', CURSOR_VAR, EXPORT_FORMAT_VAR):
+            lookup_params.pop(name, None)
+        return lookup_params
+
+    def apply_list_filters(self, request):
+        """
+        Compiles the active list filters into `filter_sql` and `filter_sql_params`, which
+        `get_where_clause` ANDs with the search predicate, so every query of the search
+        (page, count, export, bulk actions) is filtered in the same statement.
+        The filters are applied to a queryset the way django's changelist does, so any
+        filter class works, and its WHERE clause is compiled by the ORM. Predicates on
+        the columns of the model stay inline, where postgres can combine their indexes
+        with the search index; filters across relations become a primary key semi-join.
+        """
+        (self.filter_specs, self.has_filters, remaining_lookup_params,
+         filters_may_have_duplicates, self.has_active_filters) = self.get_filters(request)
+        self.clear_all_filters_qs = self.get_query_string(
+            new_params=remaining_lookup_params,
+            remove=self.get_filters_params(),
+        )
+        if not self.has_active_filters and not remaining_lookup_params:
+            return
+
+        queryset = self.root_queryset
+        try:
+            for filter_spec in self.filter_specs:
+                new_queryset = filter_spec.queryset(request, queryset)
+                if new_queryset is not None:
+                    queryset = new_queryset
+            queryset = queryset.filter(**remaining_lookup_params)
+        except (SuspiciousOperation, ImproperlyConfigured):
+            raise
+        except Exception as e:
+            raise IncorrectLookupParameters(e)
+
+        query = queryset.query
+        # the filtered rows also depend on the rows of the models that the filters join
+        tables = {i.table_name for i in query.alias_map.values()} - {self.opts.db_table}
+        self.filter_models = [
+            i for i in apps.get_models(include_auto_created=True) if i._meta.db_table in tables
+        ]
+        if len(query.alias_map) > 1:
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            sql = f"{self.opts.db_table}.{self.opts.pk.column} IN ({sql})"
+        else:
+            sql, params = query.get_compiler(self.search_db).compile(query.where)
+        if sql:
+            self.filter_sql, self.filter_sql_params = f"({sql})", list(params)
+
+    def get_searched_related_models(self) -> list:
+        """
+        returns the related models whose rows the search of `lookup_field` and the active
+        list filters depend on
+        """
+        lookups = self.search_fields if self.lookup_field == ALL_FIELDS else [self.lookup_field]
+        models = []
+        for lookup in lookups:
+            models += [i for i in get_related_models(self.model, lookup) if i not in models]
+        return models + [i for i in self.filter_models if i not in models]
+
+    @property
+    def rank_ordering(self) -> bool:
+        """
+        whether a page without an explicit `o` ordering is ordered by full text relevance.
+        The rank of a related row cannot be ordered on without joining it, so only
+        the fields of the model itself are ranked.
+        """
+        return self.model_admin.fulltext_ranking and self.lookup_field != ALL_FIELDS and \
+            LOOKUP_SEP not in self.lookup_field and self.get_match_mode(self.lookup_field) == 'fulltext'
+
+    def get_rank_ordering(self) -> str:
+        """
+        returns an `ORDER BY ts_rank(...)` clause for a full text search.
+        Its query text is the last parameter, see `get_ordering_params`.
+        """
+        table = self.opts.db_table
+        vector = f'{table}.{get_search_vector_column(self.opts.get_field(self.lookup_field).column)}'
+        config = self.model_admin.fulltext_config
+        return f" ORDER BY ts_rank({vector}, websearch_to_tsquery('{config}', %s)) DESC, " \
+               f"{table}.{self.opts.pk.column} "
+
+    def get_ordering_params(self, order_code: str, searched_data: str) -> list:
+        if order_code or not self.rank_ordering:
+            return []
+        return [searched_data]
 
     def get_ordering_kwargs(self) -> str:
         """
@@ -95,41 +376,317 @@ class SearchOnlyChangeList(ChangeList):
         Indirectly uses the `o` parameter of changelist request.GET
         (using `get_ordering_field_columns` method).
 
+        The columns are qualified with the table name, so the columns of
+        joined tables cannot make them ambiguous.
+
         sample output for a model that has fields: id, author, name:
-        >>> "ORDER BY id asc, author asc, title asc"
+        >>> "ORDER BY books_book.id asc, books_book.author_id asc, books_book.title asc"
         """
 
         order_enum = self.get_ordering_field_columns()
-        kwargs = {self.list_display[i]: order_enum[i] for i in order_enum}
+        kwargs = {}
+        for i in order_enum:
+            try:
+                column = self.opts.get_field(self.list_display[i]).column
+            except FieldDoesNotExist:
+                continue
+            kwargs[f'{self.opts.db_table}.{column}'] = order_enum[i]
+        if not kwargs:
+            return self.get_default_ordering()
         kwargs_string = 'ORDER BY ' + \
             ', '.join([f'{i} {kwargs[i]}' for i in kwargs])
 
         return kwargs_string
 
+    def get_default_ordering(self) -> str:
+        column = self.opts.get_field(self.model_admin.default_sorting_key).column
+        return f"""
+            ORDER BY {self.opts.db_table}.{column}
+            {self.model_admin.default_sorting_order}"""
+
+    def get_list_select_related(self) -> list[str]:
+        """
+        returns the forward relations whose rows are joined into the page query,
+        following `list_select_related` the way django's changelist does:
+        `True` joins every foreign key, a sequence joins the given lookups (`author__user`)
+        and `False` joins the foreign keys that are columns of `list_display`.
+        Every prefix of a nested lookup is joined as well.
+        """
+        if self.list_select_related is True:
+            lookups = [i.name for i in self.opts.concrete_fields if i.is_relation]
+        elif self.list_select_related:
+            lookups = list(self.list_select_related)
+        else:
+            lookups = []
+            for name in self.list_display:
+                try:
+                    field = self.opts.get_field(name)
+                except (FieldDoesNotExist, TypeError):  # callables are no fields
+                    continue
+                if field.is_relation and field.concrete:
+                    lookups.append(name)
+
+        expanded = []
+        for lookup in lookups:
+            parts = lookup.split(LOOKUP_SEP)
+            for i in range(1, len(parts) + 1):
+                prefix = LOOKUP_SEP.join(parts[:i])
+                if prefix not in expanded:
+                    expanded.append(prefix)
+        return expanded
+
+    @cached_property
+    def related_joins(self) -> list[dict]:
+        """
+        describes the joins of `get_list_select_related`: the lookup, the foreign key,
+        the lookup it hangs off (or '' for the model itself) and the alias of the joined table.
+        """
+        joins = {}
+        for lookup in self.get_list_select_related():
+            parent, _, name = lookup.rpartition(LOOKUP_SEP)
+            parent_model = joins[parent]['model'] if parent else self.model
+            field = parent_model._meta.get_field(name)
+            joins[lookup] = {
+                'lookup': lookup,
+                'parent': parent,
+                'field': field,
+                'model': field.related_model,
+                'alias': f'bigrecord_rel{len(joins)}',
+            }
+        return list(joins.values())
+
+    def get_projected_fields(self) -> Union[list[str], None]:
+        """
+        returns the names of the fields that the page query selects: the `list_display`
+        fields, the sort keys and `list_extra_fields` (the primary key is always selected).
+        The other fields, e.g. a large `TextField`, are deferred and never read from disk.
+        returns None (every field) when `list_display` has callables and the model admin
+        does not name the fields they need in `list_extra_fields`.
+        """
+        extra_fields = self.model_admin.list_extra_fields
+        names = []
+        for name in self.list_display:
+            if name == 'action_checkbox':  # only needs the primary key
+                continue
+            try:
+                names.append(self.opts.get_field(name).name)
+            except FieldDoesNotExist:
+                if extra_fields is None:
+                    return None
+        names += list(extra_fields or [])
+        names.append(self.model_admin.default_sorting_key)
+        if self.cursor_ordering is not None:
+            names.append(self.cursor_ordering[0])
+        return names
+
+    def get_projected_queryset(self):
+        names = self.get_projected_fields()
+        if names is None:
+            return self.root_queryset
+        return self.root_queryset.only(*dict.fromkeys(names))
+
+    def get_select_sql(self) -> str:
+        """
+        returns `SELECT ... FROM <table>` of the page query. The rows of the related
+        objects shown by `list_display` are selected through `LEFT OUTER JOIN`s in the
+        same statement and put onto the instances by `hydrate_related`, so a raw page,
+        which cannot `select_related`, costs one query instead of one per row.
+        """
+        root_query = str(self.get_projected_queryset().query)
+        if not self.related_joins:
+            return root_query
+
+        quote = connections[self.search_db].ops.quote_name
+        from_clause_index = root_query.find(' FROM ')
+        columns, joins = [], []
+        for join in self.related_joins:
+            alias = join['alias']
+            parent_alias = self.opts.db_table
+            if join['parent']:
+                parent_alias = next(i['alias'] for i in self.related_joins if i['lookup'] == join['parent'])
+            columns += [
+                f"{alias}.{quote(i.column)} AS {quote(f'{alias}__{i.attname}')}"
+                for i in join['model']._meta.concrete_fields
+            ]
+            joins.append(
+                f"LEFT OUTER JOIN {quote(join['model']._meta.db_table)} {alias} "
+                f"ON ({parent_alias}.{quote(join['field'].column)} = "
+                f"{alias}.{quote(join['field'].target_field.column)})"
+            )
+        return root_query[:from_clause_index] + ', ' + ', '.join(columns) + \
+            root_query[from_clause_index:] + ' ' + ' '.join(joins)
+
+    def hydrate_related(self, rows: list) -> list:
+        """
+        builds the related instances out of the joined columns of each row and caches
+        them on their foreign keys, so `obj.author` needs no query.
+        """
+        db = self.queryset.db
+        for obj in rows:
+            instances = {'': obj}
+            for join in self.related_joins:
+                fields = join['model']._meta.concrete_fields
+                values = [obj.__dict__.pop(f"{join['alias']}__{i.attname}", None) for i in fields]
+                parent = instances.get(join['parent'])
+                related = None
+                if values[fields.index(join['model']._meta.pk)] is not None:
+                    related = join['model'].from_db(db, [i.attname for i in fields], values)
+                instances[join['lookup']] = related
+                if parent is not None:
+                    join['field'].set_cached_value(parent, related)
+        return rows
+
     def get_sql(self, order_code: str = '', page_number: int = 1) -> str:
         """
         param `order_code`: a django coding for changelist ordering
         returns a complete sql query with limit & offset
         """
-        root_query = str(self.root_queryset.query)
-        from_clause_index = root_query.capitalize().find('FROM')
-        select_clause = root_query[:from_clause_index]
+        root_query = self.get_select_sql()
 
-        searchparams = self.get_search_clause(self.lookup_field)
-        if order_code:
-            ordering_params = self.get_ordering_kwargs()
-        else:
-            ordering_params = f"""
-            ORDER BY {self.model_admin.default_sorting_key} 
-            {self.model_admin.default_sorting_order}"""
+        searchparams = self.get_where_clause(self.searched_data)
+        ordering_params = self.get_order_by(order_code)
 
         sql = root_query + ' WHERE ' + searchparams + ordering_params \
             + f' LIMIT {self.list_per_page}' + \
               f' OFFSET {self.list_per_page * (page_number - 1)}'
         return sql
 
-    def get_search_queryset(self, sql_string: str, searched_data: str):
-        queryset = self.model.objects.raw(sql_string, [f'%{searched_data}%'])
+    def get_order_by(self, order_code: str = '') -> str:
+        """returns the `ORDER BY` clause of an offset page or of an export"""
+        if order_code:
+            return self.get_ordering_kwargs()
+        if self.rank_ordering:
+            return self.get_rank_ordering()
+        return self.get_default_ordering()
+
+    def get_export_sql(self, fields: list) -> str:
+        """
+        returns the query of `OptimizedAdminSearchMixin.export_view`: the columns of `fields`
+        of every row the search matches, in the order of the changelist, without a limit.
+        Its parameters are the search parameters followed by `get_ordering_params`.
+        """
+        table = self.opts.db_table
+        quote = connections[self.search_db].ops.quote_name
+        columns = ', '.join(f'{table}.{quote(i.column)}' for i in fields)
+        return f"SELECT {columns} FROM {table} WHERE {self.get_where_clause(self.searched_data)}" + \
+            self.get_order_by(self.order_code)
+
+    def get_keyset_ordering(self, order_code: str = '') -> tuple[str, str]:
+        """
+        returns the (field name, direction) pair that a keyset page is sorted on.
+        The first sortable column of the `o` parameter wins over `default_sorting_key`.
+        The primary key is always appended as a tie-breaker by `get_keyset_sql`.
+        """
+        if order_code:
+            for i, order in self.get_ordering_field_columns().items():
+                try:
+                    field = self.opts.get_field(self.list_display[i])
+                except FieldDoesNotExist:
+                    continue
+                return field.name, order.upper()
+        return (self.model_admin.default_sorting_key,
+                self.model_admin.default_sorting_order.upper())
+
+    def get_keyset_columns(self, sort_key: str) -> list[str]:
+        table = self.opts.db_table
+        pk = self.opts.pk.column
+        column = self.opts.get_field(sort_key).column
+        if column == pk:
+            return [f'{table}.{pk}']
+        return [f'{table}.{column}', f'{table}.{pk}']
+
+    def get_keyset_sql(self, order_code: str = '', cursor: dict = None) -> str:
+        """
+        param `order_code`: a django coding for changelist ordering
+        param `cursor`: a decoded cursor (see `get_cursor`) or None for the first page
+        returns a seek query which starts right after the row that the cursor points at
+        instead of skipping `OFFSET` rows, so every page costs as much as the first one.
+        One extra row is fetched to find out whether there is another page.
+        """
+        root_query = self.get_select_sql()
+        searchparams = self.get_where_clause(self.searched_data)
+        sort_key, order = self.get_keyset_ordering(order_code)
+        columns = self.get_keyset_columns(sort_key)
+
+        if cursor is not None and cursor['direction'] == 'prev':
+            order = 'DESC' if order == 'ASC' else 'ASC'
+
+        sql = root_query + ' WHERE ' + searchparams
+        if cursor is not None:
+            operator = '>' if order == 'ASC' else '<'
+            placeholders = ', '.join(['%s'] * len(columns))
+            sql += f"AND ({', '.join(columns)}) {operator} ({placeholders}) "
+        sql += 'ORDER BY ' + ', '.join(f'{i} {order}' for i in columns) + \
+               f' LIMIT {self.list_per_page + 1}'
+        return sql
+
+    def get_cursor(self, token: str, searched_data: str, order_code: str = ''):
+        """
+        decodes the `c` parameter. A cursor is only valid for the search and the
+        ordering it was made for; otherwise the first page is shown.
+        """
+        if not token:
+            return None
+        cursor = decode_cursor(token)
+        if cursor is None:
+            return None
+        if cursor['search'] != self.get_cursor_search(searched_data) or \
+                cursor['ordering'] != list(self.get_keyset_ordering(order_code)):
+            return None
+        return cursor
+
+    def get_cursor_search(self, searched_data: str) -> list:
+        """
+        returns what a cursor is made for besides its ordering: the search and a digest of
+        the list filters, so a cursor kept in a filter link is not applied to other rows
+        """
+        return [searched_data, self.lookup_field, make_digest([self.filter_sql, self.filter_sql_params])]
+
+    def make_cursor(self, direction: str, obj) -> str:
+        sort_key, order = self.cursor_ordering
+        values = [getattr(obj, self.opts.get_field(sort_key).attname)]
+        if len(self.get_keyset_columns(sort_key)) > 1:
+            values.append(obj.pk)
+        return encode_cursor({
+            'direction': direction,
+            'search': self.cursor_search,
+            'ordering': [sort_key, order],
+            'values': values,
+        })
+
+    def paginate_keyset(self, rows: list) -> list:
+        """
+        trims the look-ahead row off a keyset page, restores the display order of
+        a backward page and sets the cursors of the prev/next links.
+        """
+        backwards = self.cursor is not None and self.cursor['direction'] == 'prev'
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if backwards:
+            rows.reverse()
+
+        has_next = backwards or has_more
+        has_prev = has_more if backwards else self.cursor is not None
+        if rows and has_next:
+            self.next_cursor = self.make_cursor('next', rows[-1])
+        if rows and has_prev:
+            self.prev_cursor = self.make_cursor('prev', rows[0])
+        return rows
+
+    @property
+    def next_page_url(self):
+        if self.next_cursor:
+            return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    @property
+    def prev_page_url(self):
+        if self.prev_cursor:
+            return self.get_query_string({CURSOR_VAR: self.prev_cursor})
+
+    def get_search_queryset(self, sql_string: str, searched_data: str, extra_params: Sequence = ()):
+        self.page_sql = sql_string
+        self.page_params = [*self.get_where_params(searched_data), *extra_params]
+        queryset = self.model.objects.raw(sql_string, self.page_params, using=self.search_db)
         return queryset
 
     def pagination_required(self, request):
@@ -137,63 +694,390 @@ class SearchOnlyChangeList(ChangeList):
         return
 
     def count_search_result(self, searched_data: str) -> int:
-        searchparams = self.get_search_clause(self.lookup_field)
-        sql = f"SELECT COUNT(*) FROM {self.opts.db_table} WHERE {searchparams}"
-        cursor = connection.cursor()
-        cursor.execute(sql, [f'%{searched_data}%'])
-        self.search_result_count = cursor.fetchone()[0]
+        """
+        counts the search result with the `count_strategy` of the model admin:
+        `exact`: a plain COUNT(*), which has to visit every matching row.
+        `capped`: stops counting after `count_cap` rows; the count is then shown as "10,000+".
+        `estimate`: the row estimate of the planner taken from `EXPLAIN`; no row is visited.
+        `search_result_count_exact` tells whether the returned number is exact.
+        """
+        params = self.get_where_params(searched_data)
+        try:
+            with self.timer('count_query'), statement_timeout(self.model_admin.query_timeout, self.search_db), \
+                    connections[self.search_db].cursor() as cursor:
+                cursor.execute(self.get_count_sql(), params)
+                value = cursor.fetchone()[0]
+        except OperationalError as e:
+            if not is_query_canceled(e):
+                raise
+            return self.set_count_unavailable()
+        return self.set_search_result_count(value)
+
+    def get_count_sql(self) -> str:
+        """returns the count query of the `count_strategy`, see `count_search_result`"""
+        strategy = self.model_admin.count_strategy
+        searchparams = self.get_where_clause(self.searched_data)
+        from_clause = f"FROM {self.opts.db_table} WHERE {searchparams}"
+        if strategy == 'estimate':
+            return f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause}"
+        if strategy == 'capped':
+            return f"SELECT COUNT(*) FROM (SELECT 1 {from_clause} LIMIT {self.model_admin.count_cap + 1}) AS capped"
+        return f"SELECT COUNT(*) {from_clause}"
+
+    def set_search_result_count(self, value) -> int:
+        """param `value`: the single value that the query of `get_count_sql` returned"""
+        strategy = self.model_admin.count_strategy
+        if strategy == 'estimate':
+            plan = json.loads(value) if isinstance(value, str) else value
+            count, exact = int(plan[0]['Plan']['Plan Rows']), False
+        elif strategy == 'capped':
+            cap = self.model_admin.count_cap
+            count, exact = min(value, cap), value <= cap
+        else:
+            count, exact = value, True
+
+        self.search_result_count = count
+        self.search_result_count_exact = exact
         return self.search_result_count
 
+    def set_count_unavailable(self) -> int:
+        # over the time budget: the page is still shown, only without a count
+        self.search_result_count, self.search_result_count_exact = 0, False
+        self.search_result_count_available = False
+        return self.search_result_count
+
+    def get_count_cache_key(self, searched_data: str) -> str:
+        return make_cache_key(
+            self.model, 'count',
+            field=self.lookup_field,
+            q=searched_data.lower(),  # the search is case-insensitive
+            filters=[self.filter_sql, self.filter_sql_params],
+            # a related field search or filter also depends on the rows of the related models
+            related_versions=[get_model_version(i) for i in self.get_searched_related_models()],
+            strategy=[self.model_admin.count_strategy, self.model_admin.count_cap],
+        )
+
+    def get_search_result_count(self, searched_data: str) -> int:
+        """
+        returns the count from the shared cache or counts and caches it.
+        The cache is shared by every user and dropped whenever the model is written to.
+        """
+        timeout = self.model_admin.count_cache_timeout
+        if not timeout:
+            return self.count_search_result(searched_data)
+
+        key = self.get_count_cache_key(searched_data)
+        cached = cache.get(key)
+        if cached is None:
+            self.count_search_result(searched_data)
+            if self.search_result_count_available:
+                cache.set(key, (self.search_result_count, self.search_result_count_exact), timeout)
+        else:
+            self.search_result_count, self.search_result_count_exact = cached
+        return self.search_result_count
+
+    def start_search_result_count(self, searched_data: str):
+        """
+        With `concurrent_count` on the model admin, a count that is not cached is
+        started in the thread pool on a connection of its own and awaited by
+        `get_results` after the page is fetched, so a cold search takes as long as
+        the slower of the two queries instead of their sum.
+        """
+        if not self.model_admin.concurrent_count:
+            return self.get_search_result_count(searched_data)
+        timeout = self.model_admin.count_cache_timeout
+        if timeout:
+            cached = cache.get(self.get_count_cache_key(searched_data))
+            if cached is not None:
+                self.search_result_count, self.search_result_count_exact = cached
+                return self.search_result_count
+        self.count_future = submit_query(self.get_search_result_count, searched_data)
+
+    def wait_search_result_count(self) -> int:
+        if self.count_future is not None:
+            self.count_future.result()
+            self.count_future = None
+        return self.search_result_count
+
+    @property
+    def search_result_count_display(self) -> str:
+        """
+        the result count as shown in the records banner, e.g. `1,234`, `10,000+` or `~52,000`
+        """
+        if not self.search_result_count_available:
+            return 'Count unavailable'
+        count = f'{self.search_result_count:,}'
+        if self.search_result_count_exact:
+            return count
+        if self.model_admin.count_strategy == 'capped':
+            return count + '+'
+        return '~' + count
+
+    def get_lookup_field(self, mf: str) -> str:
+        """
+        returns the search field that the `mf` parameter selects by its index in `search_fields`,
+        or `ALL_FIELDS` with `all_fields_search`. Anything else is an incorrect lookup.
+        """
+        if mf == ALL_FIELDS and self.model_admin.all_fields_search:
+            return ALL_FIELDS
+        try:
+            index = int(mf)
+        except ValueError as e:
+            raise IncorrectLookupParameters(e)
+        if not 0 <= index < len(self.search_fields):
+            raise IncorrectLookupParameters(f"There is no search field {index}")
+        return self.search_fields[index]
+
     def get_queryset(self, request):
         """
         The main logic of the class lays here.
         """
         request_data = request.GET
         q = request_data.get('q')
+        mf = request_data.get('mf')  # mf: model_field to look up for
 
-        if not q:
+        if not q or not mf:
+            # a search without a field shows no rows, like an empty one
+            self.apply_list_filters(request)
             return self.root_queryset.none()
 
-        if 'mf' in request_data:  # mf: model_field to look up for
-            search_field_index = int(request_data['mf'])
-            self.lookup_field = self.search_fields[search_field_index]
+        # chosen once, before the count may start on another thread,
+        # so the count and the page come from the same database
+        self.search_db = self.model_admin.get_search_database()
+        self.apply_list_filters(request)
 
-        if request.session.get('search_param') != q + request_data.get('mf'):
-            request.session['search_param'] = q + request_data.get('mf')
-            self.model_admin.paginator.count = \
-                request.session['count'] = self.count_search_result(q)
-        else:
-            self.search_result_count = request.session['count']
+        self.lookup_field = self.get_lookup_field(mf)
+        self.searched_data = q
 
-        order_code = request_data.get('o')
-        page_number = request_data.get('p') if request_data.get('p') else 1
+        self.start_search_result_count(q)
 
-        if '__' in self.lookup_field:
-            sql_string = ''
-        else:
-            sql_string = self.get_sql(order_code, page_number)
+        order_code = self.order_code = request_data.get('o')
+        # `p=0` or a negative page would make a negative OFFSET
+        page_number = self.page_num = max(self.page_num, 1)
+
+        if self.keyset_pagination:
+            self.cursor = self.get_cursor(request_data.get(CURSOR_VAR), q, order_code)
+            self.cursor_search = self.get_cursor_search(q)
+            self.cursor_ordering = self.get_keyset_ordering(order_code)
+            with self.timer('sql_build'):
+                sql_string = self.get_keyset_sql(order_code, self.cursor)
+            cursor_values = self.cursor['values'] if self.cursor else ()
+            return self.get_search_queryset(sql_string, q, cursor_values)
 
-        queryset = self.get_search_queryset(sql_string, q)
+        with self.timer('sql_build'):
+            sql_string = self.get_sql(order_code, page_number)
+        queryset = self.get_search_queryset(sql_string, q, self.get_ordering_params(order_code, q))
         return queryset
 
+    def fetch_page(self, request, queryset) -> list:
+        """
+        reads the page within the `query_timeout` of the model admin. A page that takes
+        longer is reported to the user and shown empty instead of failing with a 500 error.
+        With `page_cache_timeout`, the primary keys of a page are cached and a repeated
+        page is read by its primary keys instead of running the search again.
+        """
+        pks = self.get_cached_page()
+        if pks is not None:
+            queryset = self.get_pk_queryset(pks)
+        try:
+            with statement_timeout(self.model_admin.query_timeout, self.search_db), \
+                    connections[self.search_db].execute_wrapper(self.time_query('page_query')), \
+                    self.timer('page_fetch'):
+                rows = self.hydrate_related(list(queryset))
+        except OperationalError as e:
+            if not is_query_canceled(e):
+                raise
+            self.report_page_timeout(request)
+            return []
+
+        # a raw queryset builds the model instances while it reads the rows
+        self.timings['hydration'] = round(
+            self.timings.pop('page_fetch') - self.timings.get('page_query', 0), 3)
+        if pks is not None:
+            positions = {pk: i for i, pk in enumerate(pks)}
+            return sorted(rows, key=lambda obj: positions[obj.pk])
+
+        self.cache_page(rows)
+        if self.model_admin.explain_search and self.page_sql:
+            self.explain_page()
+        return rows
+
+    def report_page_timeout(self, request):
+        self.model_admin.message_user(
+            request,
+            "The search took too long and was cancelled. "
+            "Try a longer search term or another field.",
+            messages.ERROR,
+        )
+
+    def get_page_cache_key(self, sql: str = None, params: Sequence = None) -> str:
+        """
+        The page query and its parameters stand for the field, the search, the ordering,
+        the page number or cursor and the page size at once.
+        Defaults to the query of the current page.
+        """
+        return make_cache_key(
+            self.model, 'page',
+            sql=self.page_sql if sql is None else sql,
+            params=self.page_params if params is None else list(params),
+            related_versions=[get_model_version(i) for i in self.get_searched_related_models()],
+        )
+
+    def get_cached_page(self) -> Union[list, None]:
+        """returns the cached primary keys of the page in their order, or None"""
+        if not self.model_admin.page_cache_timeout or not self.page_sql:
+            return None
+        pks = cache.get(self.get_page_cache_key())
+        self.page_cache_hit = pks is not None
+        return pks
+
+    def cache_page(self, rows: list):
+        if self.model_admin.page_cache_timeout and self.page_sql:
+            cache.set(self.get_page_cache_key(), [obj.pk for obj in rows], self.model_admin.page_cache_timeout)
+
+    def prefetch_next_page(self):
+        """
+        With `prefetch_next_page` and the page cache on, the page after the current one
+        (by page number, or by the next cursor in keyset mode) is searched in the
+        background and its primary keys are cached, so the "next" click is a cache hit.
+        At most `BIGRECORD_BACKGROUND_LIMIT` prefetches run at a time; others are dropped.
+        """
+        if not (self.model_admin.prefetch_next_page and self.model_admin.page_cache_timeout and self.page_sql):
+            return
+        if self.keyset_pagination:
+            if not self.next_cursor:
+                return
+            cursor = decode_cursor(self.next_cursor)
+            sql = self.get_keyset_sql(self.order_code, cursor)
+            params = [*self.get_where_params(self.searched_data), *cursor['values']]
+        else:
+            if self.search_result_count_exact and self.page_num * self.list_per_page >= self.search_result_count:
+                return
+            # the next page differs only in its OFFSET
+            sql = self.get_sql(self.order_code, self.page_num + 1)
+            params = self.page_params
+
+        key = self.get_page_cache_key(sql, params)
+        if cache.get(key) is None:
+            submit_background(
+                self.warm_page_cache, sql, params, self.opts.pk.column, key,
+                self.model_admin.page_cache_timeout, self.model_admin.query_timeout, self.search_db,
+            )
+
+    @staticmethod
+    def warm_page_cache(sql: str, params: list, pk_column: str, key: str, timeout: int, query_timeout, using: str):
+        """runs a page query in a worker thread and caches the primary keys of its rows"""
+        with statement_timeout(query_timeout, using), connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+            pk_index = [col[0] for col in cursor.description].index(pk_column)
+            pks = [row[pk_index] for row in cursor.fetchall()]
+        cache.set(key, pks, timeout)
+
+    def get_pk_queryset(self, pks: list):
+        """
+        returns the rows of a cached page by their primary keys, an index lookup per row.
+        An empty page needs no query at all.
+        """
+        if not pks:
+            return []
+        return self.model.objects.raw(self.get_pk_sql(pks), pks, using=self.search_db)
+
+    def get_pk_sql(self, pks: list) -> str:
+        placeholders = ', '.join(['%s'] * len(pks))
+        return self.get_select_sql() + \
+            f" WHERE {self.opts.db_table}.{self.opts.pk.column} IN ({placeholders})"
+
+    @contextmanager
+    def timer(self, name: str):
+        """records the milliseconds the block takes in `timings[name]`"""
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((perf_counter() - t0) * 1000, 3)
+
+    def time_query(self, name: str):
+        """
+        returns a `connections[...].execute_wrapper` that adds the milliseconds spent in the
+        database to `timings[name]`
+        """
+        def wrapper(execute, sql, params, many, context):
+            t0 = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.timings[name] = round(self.timings.get(name, 0) + (perf_counter() - t0) * 1000, 3)
+        return wrapper
+
+    def explain_page(self):
+        """
+        captures the `EXPLAIN (ANALYZE, BUFFERS)` plan of the page query.
+        ANALYZE runs the query once more, so it is only done with `explain_search`.
+        """
+        with connections[self.search_db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {self.page_sql}", self.page_params)
+            self.explain = '\n'.join(row[0] for row in cursor.fetchall())
+
+    def get_search_stats(self) -> dict:
+        """
+        returns where the search spent its time, for the debug toolbar panel and the log
+        """
+        return {
+            'model': self.opts.label,
+            'field': self.lookup_field,
+            'q': self.searched_data,
+            'count': self.search_result_count_display,
+            'count_strategy': self.model_admin.count_strategy,
+            'pagination': self.model_admin.pagination_mode,
+            'page_cache_hit': self.page_cache_hit,
+            'timings_ms': self.timings,
+            # the steps may overlap, e.g. a concurrent count runs during the page query
+            'total_ms': round((perf_counter() - self.started) * 1000, 3),
+            'sql': self.page_sql,
+            'explain': self.explain,
+        }
+
     def get_results(self, request):
+        try:
+            result_list = self.queryset._clone()
+        except InvalidPage:
+            raise IncorrectLookupParameters
+
+        # with `concurrent_count` the page is fetched here while the count runs on another connection
+        result_list = self.fetch_page(request, result_list)
+        self.wait_search_result_count()
+        self.set_results(request, result_list)
+
+    def set_results(self, request, result_list: list):
+        """sets the page, the paginator and the counts that the changelist template shows"""
         paginator = self.model_admin.get_paginator(
             request, self.queryset, self.list_per_page
         )
         # Get the number of objects, with admin filters applied.
         result_count = self.search_result_count
+        # a raw queryset cannot count itself, `len()` would fetch every matching row.
+        # Overrides the cached property on this instance only.
+        paginator.count = result_count
+        if result_list and not self.search_result_count_exact and not self.keyset_pagination:
+            # a capped or estimated count may end before the page that was read
+            paginator.count = max(result_count, (self.page_num - 1) * self.list_per_page + len(result_list))
         # Get the total number of objects, with no admin filters applied.
         if self.model_admin.show_full_result_count:
-            full_result_count = self.root_queryset.count()
+            full_result_count = self.root_queryset.using(self.search_db).count()
         else:
             full_result_count = None
-        can_show_all = result_count <= self.list_max_show_all
-        multi_page = result_count > self.list_per_page
+        can_show_all = self.search_result_count_exact and result_count <= self.list_max_show_all
+        multi_page = paginator.count > self.list_per_page
+        if self.page_num > paginator.num_pages:
+            # the page links of the template start from the current page, which has to be counted
+            multi_page = False
 
-        try:
-            result_list = self.queryset._clone()
-        except InvalidPage:
-            raise IncorrectLookupParameters
+        if self.keyset_pagination and self.cursor_search is not None:
+            # page numbers mean nothing to a keyset page, the prev/next cursors do the job
+            result_list = self.paginate_keyset(result_list)
+            multi_page = False
+
+        self.prefetch_next_page()
 
         self.result_count = result_count
         self.show_full_result_count = self.model_admin.show_full_result_count
@@ -209,6 +1093,127 @@ class SearchOnlyChangeList(ChangeList):
         self.paginator = paginator
 
 
+class AsyncSearchOnlyChangeList(SearchOnlyChangeList):
+    """
+    The changelist of the async changelist view. It is built like `SearchOnlyChangeList`,
+    but leaves the count and the page query to `aget_results`, which runs them at the same
+    time on the async driver (see `async_db.fetch_all`). While postgres scans, the event
+    loop serves other requests instead of a worker thread waiting on a slow `LIKE`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.count_cache_key = self.page_cache_key = None
+        super().__init__(*args, **kwargs)
+
+    def start_search_result_count(self, searched_data: str):
+        # counted by `aget_results`; the cache keys read the cache, so they are made here
+        if self.model_admin.count_cache_timeout:
+            self.count_cache_key = self.get_count_cache_key(searched_data)
+
+    def get_results(self, request):
+        # the changelist view reads these before `aget_results` sets the real page
+        self.result_count = self.full_result_count = 0
+        self.result_list = []
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = True
+        self.can_show_all = self.multi_page = False
+        self.paginator = None
+        if self.model_admin.page_cache_timeout and self.page_sql:
+            self.page_cache_key = self.get_page_cache_key()
+
+    async def aget_results(self, request):
+        _, rows = await asyncio.gather(self.aget_search_result_count(), self.afetch_page(request))
+        await sync_to_async(self.set_results)(request, rows)
+
+    async def aget_search_result_count(self) -> int:
+        if self.count_cache_key is not None:
+            cached = await cache.aget(self.count_cache_key)
+            if cached is not None:
+                self.search_result_count, self.search_result_count_exact = cached
+                return self.search_result_count
+
+        with self.timer('count_query'):
+            result = await fetch_all(
+                self.get_count_sql(), self.get_where_params(self.searched_data),
+                using=self.search_db, timeout=self.model_admin.query_timeout,
+            )
+        if result is None:
+            return self.set_count_unavailable()
+
+        _, rows = result
+        self.set_search_result_count(rows[0][0])
+        if self.count_cache_key is not None:
+            await cache.aset(
+                self.count_cache_key, (self.search_result_count, self.search_result_count_exact),
+                self.model_admin.count_cache_timeout,
+            )
+        return self.search_result_count
+
+    async def afetch_page(self, request) -> list:
+        """the async counterpart of `fetch_page`"""
+        pks = None
+        if self.page_cache_key is not None:
+            pks = await cache.aget(self.page_cache_key)
+            self.page_cache_hit = pks is not None
+        if pks == []:
+            return []
+
+        sql, params = (self.page_sql, self.page_params) if pks is None else (self.get_pk_sql(pks), pks)
+        with self.timer('page_query'):
+            result = await fetch_all(sql, params, using=self.search_db, timeout=self.model_admin.query_timeout)
+        if result is None:
+            self.report_page_timeout(request)
+            return []
+
+        with self.timer('hydration'):
+            rows = self.hydrate_related(self.build_instances(*result))
+        if pks is not None:
+            positions = {pk: i for i, pk in enumerate(pks)}
+            return sorted(rows, key=lambda obj: positions[obj.pk])
+
+        if self.page_cache_key is not None:
+            await cache.aset(self.page_cache_key, [obj.pk for obj in rows], self.model_admin.page_cache_timeout)
+        if self.model_admin.explain_search:
+            await sync_to_async(self.explain_page)()
+        return rows
+
+    def build_instances(self, columns: list[str], rows: list[tuple]) -> list:
+        """
+        turns the rows of the async driver into model instances like a raw queryset does:
+        the columns of the model go to `from_db` (the missing ones are deferred),
+        the other ones, e.g. those of `hydrate_related`, become attributes.
+        """
+        positions = {column: i for i, column in enumerate(columns)}
+        fields = [i for i in self.opts.concrete_fields if i.column in positions]
+        field_names = [i.attname for i in fields]
+        field_positions = [positions[i.column] for i in fields]
+        extra = [(i, column) for i, column in enumerate(columns) if i not in field_positions]
+
+        db = self.queryset.db
+        instances = []
+        for row in rows:
+            obj = self.model.from_db(db, field_names, [row[i] for i in field_positions])
+            for i, column in extra:
+                setattr(obj, column, row[i])
+            instances.append(obj)
+        return instances
+
+
+class SearchExportChangeList(SearchOnlyChangeList):
+    """
+    The changelist of `export_view` and `bulk_view`. It builds the search of the request
+    like `SearchOnlyChangeList`, but neither counts it nor reads a page.
+    """
+
+    def start_search_result_count(self, searched_data: str):
+        return None
+
+    def get_results(self, request):
+        self.result_count = self.full_result_count = 0
+        self.result_list = []
+        self.can_show_all = self.multi_page = False
+
+
 class OptimizedAdminSearchMixin:
     """
     Wraps the whole optimized django admin site logic.
@@ -217,21 +1222,413 @@ class OptimizedAdminSearchMixin:
     default_sorting_key = 'id'
     search_fields = ['id']
     default_sorting_order = 'ASC'  # or 'DESC'
+    pagination_mode = 'offset'  # or 'keyset'
+    count_strategy = 'exact'  # or 'capped', 'estimate'
+    count_cap = 10000  # used by the 'capped' count strategy
+    search_match_modes = {}  # search field -> 'contains' (default), 'prefix', 'exact' or 'fulltext'
+    fulltext_config = 'english'  # text search configuration of the 'fulltext' fields
+    fulltext_ranking = False  # order 'fulltext' results by ts_rank when no column is sorted
     list_per_page = 15
     change_list_template = 'admin/bigrecord_change_list.html'
     show_full_result_count = False
+    count_cache_timeout = 60 * 5  # seconds, 0 disables the shared count cache
+    page_cache_timeout = 0  # seconds the primary keys of a page are cached, 0 disables it
+    prefetch_next_page = False  # warm the page cache for the next page in the background
+    concurrent_count = False  # count on another connection while the page is fetched
+    query_timeout = None  # milliseconds each search query may take, None for no limit
+    explain_search = False  # capture EXPLAIN (ANALYZE, BUFFERS) of the page query; runs it twice
+    list_extra_fields = None  # fields the callables of list_display need; None loads every field for them
+    all_fields_search = False  # offer an "All fields" choice, searched with a UNION of per-field subqueries
+    async_search = False  # serve searches from an async view on psycopg 3 (ASGI)
+    bulk_actions = False  # offer deleting or updating every row of a search result at once
+    bulk_update_fields = ()  # fields that a bulk update may set
+    bulk_batch_size = 10000  # primary keys per statement of a bulk action
+    background_jobs = False  # run bulk actions as background jobs with a progress widget
+    autocomplete_limit = 0  # suggestions of the search box for a prefix, 0 turns them off
+    autocomplete_min_length = 2  # characters typed before suggestions are fetched
+    autocomplete_cache_timeout = 30  # seconds the suggestions of a prefix are cached
+    filter_choices_limit = 50  # choices a list filter shows at most
+    filter_sample_size = 10000  # rows a list filter of plain values reads its choices from
+    filter_cache_timeout = 60 * 10  # seconds the choices of a list filter are cached
+    export_batch_size = 2000  # rows per fetch of the server-side cursor of an export
+    export_fields = None  # fields of an export; None exports every concrete field
+    search_databases = None  # alias or list of aliases (e.g. read replicas) of the search queries; None for default
+    max_replication_lag = 10  # seconds a search database may be behind its primary to be used
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        # the models that the searches and the list filters read, whose writes outdate the caches
+        senders = {model}
+        filter_paths = [i if isinstance(i, str) else i[0] for i in self.list_filter if not isinstance(i, type)]
+        for field in [*self.search_fields, *filter_paths]:
+            senders.update(get_related_models(model, field))
+        for sender in senders:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    invalidate_on_write, sender=sender,
+                    dispatch_uid=f'bigrecord-{sender._meta.label_lower}'
+                )
+
+    def get_search_database(self) -> str:
+        """
+        returns the database that a search reads from: a reachable one of `search_databases`
+        that is at most `max_replication_lag` seconds behind, or the default database.
+        Saving and the change forms always use the default database.
+        """
+        return select_database(self.search_databases, self.max_replication_lag)
+
+    def get_list_filter(self, request):
+        """
+        swaps the stock filters that read a whole table for their choices for bounded,
+        cached ones, see `filters.get_bounded_list_filter`
+        """
+        return [get_bounded_list_filter(self.model, i) for i in super().get_list_filter(request)]
 
     def get_changelist(self, request, **kwargs):
+        if getattr(request, 'bigrecord_query_only', False):
+            return SearchExportChangeList
+        if getattr(request, 'bigrecord_async', False):
+            return AsyncSearchOnlyChangeList
         return SearchOnlyChangeList
 
+    def get_urls(self):
+        """
+        adds the `export/`, `bulk/`, `jobs/` and `autocomplete/` URLs of the views below.
+        With `async_search`, the changelist URL is served by `async_changelist_view`.
+        """
+        info = self.opts.app_label, self.opts.model_name
+        # before the catch-all `<path:object_id>/` URL of the model admin
+        urls = [
+            path('export/', self.admin_site.admin_view(self.export_view), name='%s_%s_export' % info),
+            path('bulk/', self.admin_site.admin_view(self.bulk_view), name='%s_%s_bulk' % info),
+            path('jobs/', self.admin_site.admin_view(self.jobs_view), name='%s_%s_jobs' % info),
+            path('autocomplete/', self.admin_site.admin_view(self.search_autocomplete_view),
+                 name='%s_%s_search_autocomplete' % info),
+            path('jobs/<int:job_id>/', self.admin_site.admin_view(self.job_view), name='%s_%s_job' % info),
+            *super().get_urls(),
+        ]
+        if not self.async_search:
+            return urls
+        name = '%s_%s_changelist' % info
+        return [
+            path('', self.async_changelist_view, name=name) if getattr(i, 'name', None) == name else i
+            for i in urls
+        ]
+
+    def get_export_fields(self) -> list:
+        if self.export_fields is None:
+            return list(self.opts.concrete_fields)
+        return [self.opts.get_field(i) for i in self.export_fields]
+
+    def invalid_lookup_response(self, request):
+        """
+        returns the page that `changelist_view` ends up on for incorrect search or filter parameters.
+        The views of a search show it right away: a redirect to themselves would drop the search.
+        """
+        return SimpleTemplateResponse('admin/invalid_setup.html', {'title': _('Database error')})
+
+    def export_view(self, request):
+        """
+        streams every row that the search of the request (`q`, `mf`, `o`) matches as CSV or,
+        with `format=jsonl`, as JSON lines. The rows are read through a server-side cursor
+        in batches of `export_batch_size` and written out batch by batch, so the memory use
+        stays flat for millions of rows.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        export_format = request.GET.get(EXPORT_FORMAT_VAR, 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"Unknown export format: {export_format}")
+
+        request.bigrecord_query_only = True
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return self.invalid_lookup_response(request)
+        if cl.searched_data is None or cl.lookup_field is None:
+            return HttpResponseBadRequest("Search a field first, the export contains the search result.")
+
+        fields = self.get_export_fields()
+        sql = cl.get_export_sql(fields)
+        params = [*cl.get_where_params(cl.searched_data), *cl.get_ordering_params(cl.order_code, cl.searched_data)]
+        content_type, lines = EXPORT_FORMATS[export_format]
+        batches = stream_rows(sql, params, cl.search_db, self.export_batch_size)
+
+        response = StreamingHttpResponse(lines([i.attname for i in fields], batches), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{self.opts.model_name}.{export_format}"'
+        return response
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        cl = (getattr(response, 'context_data', None) or {}).get('cl')
+        if not isinstance(cl, SearchOnlyChangeList) or cl.searched_data is None:
+            return response
+        if isinstance(cl, AsyncSearchOnlyChangeList):
+            return response  # its rows are read by `async_changelist_view`
+        return self.render_search(request, response, cl)
+
+    def bulk_view(self, request):
+        """
+        deletes, or sets one of `bulk_update_fields` on, every row that the search of the
+        request matches, not only those of the page. GET shows a confirmation form; POST runs
+        the operation as set-based SQL in primary key batches (see `bulk.run_in_batches`),
+        writes a single `LogEntry` for it and returns to the changelist.
+        """
+        operations = []
+        if self.bulk_actions and self.has_delete_permission(request):
+            operations.append(('delete', "Delete every match"))
+        if self.bulk_actions and self.bulk_update_fields and self.has_change_permission(request):
+            operations.append(('update', "Set a field of every match"))
+        if not operations:
+            raise PermissionDenied
+
+        request.bigrecord_query_only = True
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return self.invalid_lookup_response(request)
+        if cl.searched_data is None or cl.lookup_field is None:
+            return HttpResponseBadRequest("Search a field first, the operation applies to the search result.")
+
+        changelist_url = reverse(
+            'admin:%s_%s_changelist' % (self.opts.app_label, self.opts.model_name),
+            current_app=self.admin_site.name,
+        ) + cl.get_query_string()
+        form = BulkActionForm(
+            request.POST if request.method == 'POST' else None,
+            operations=operations,
+            fields=[self.opts.get_field(i) for i in self.bulk_update_fields],
+        )
+        if form.is_bound and form.is_valid():
+            data = form.cleaned_data
+            try:
+                if data['operation'] == 'update':
+                    data['value'] = self.opts.get_field(data['field']).clean(data['value'], None)
+            except ValidationError as e:
+                form.add_error('value', e)
+            else:
+                self.start_bulk_action(request, cl, data)
+                return HttpResponseRedirect(changelist_url)
+
+        cl.get_search_result_count(cl.searched_data)
+        return TemplateResponse(request, 'admin/bigrecord_bulk_confirmation.html', {
+            **self.admin_site.each_context(request),
+            'title': "Apply to all matches",
+            'opts': self.opts,
+            'cl': cl,
+            'form': form,
+            'changelist_url': changelist_url,
+        })
+
+    def start_bulk_action(self, request, cl, data: dict):
+        """
+        runs a bulk action right away, or with `background_jobs` as a job. The predicate of
+        the search is built here, so the job gets plain values instead of the request and
+        the changelist, which belong to the request thread.
+        """
+        args = (
+            request.user.pk,
+            data,
+            cl.get_where_clause(cl.searched_data),
+            cl.get_where_params(cl.searched_data),
+            f"{cl.lookup_field} matching {cl.searched_data!r}",
+        )
+        if self.background_jobs:
+            start_job(f"bulk_{data['operation']}", self.model, request.user, self.run_bulk_action, *args)
+            self.message_user(
+                request, "The operation runs in the background; its progress is shown above the results.",
+                messages.SUCCESS,
+            )
+            return
+        try:
+            changed = self.run_bulk_action(*args)
+        except ValueError as e:
+            self.message_user(request, str(e), messages.ERROR)
+        else:
+            self.message_user(request, f"{changed:,} {self.opts.verbose_name_plural} changed.", messages.SUCCESS)
+
+    def run_bulk_action(
+            self, user_id: int, data: dict, where: str, params: Sequence, search: str, on_progress=None
+    ) -> int:
+        """
+        runs the operation of a valid `BulkActionForm`, whose value is cleaned already,
+        on the default (write) database.
+        param `where`, `params`: the predicate of the search, see `SearchOnlyChangeList.get_where_clause`
+        param `search`: describes the search in the log entry, e.g. `title matching 'plant'`
+        param `on_progress`: optional callable that gets the number of changed rows and
+                          the share of the work done, see `jobs.start_job`
+        returns the number of changed rows.
+        """
+        operation = data['operation']
+        field = value = None
+        if operation == 'update':
+            field, value = self.opts.get_field(data['field']), data['value']
+
+        done = {'changed': 0}
+
+        def on_batch(changed: int, progress: float):
+            done['changed'] = changed
+            if on_progress is not None:
+                on_progress(changed, progress)
+
+        kwargs = {
+            'using': router.db_for_write(self.model),
+            'batch_size': self.bulk_batch_size,
+            'on_batch': on_batch,
+        }
+        try:
+            if operation == 'delete':
+                bulk_delete(self.model, where, params, **kwargs)
+            else:
+                bulk_update(self.model, field, value, where, params, **kwargs)
+        finally:
+            # every committed batch is logged, even if a later one failed
+            if done['changed']:
+                self.log_bulk_action(user_id, search, operation, done['changed'], field, value)
+        return done['changed']
+
+    def log_bulk_action(self, user_id: int, search: str, operation: str, changed: int, field=None, value=None):
+        """writes one admin log entry for a whole bulk action instead of one per row"""
+        if operation == 'delete':
+            action_flag, message = DELETION, f"Deleted {changed:,} rows with {search}."
+        else:
+            action_flag, message = CHANGE, f"Set {field.name} to {value!r} on {changed:,} rows with {search}."
+        # `log_action` would store the missing object id as the string 'None'
+        LogEntry.objects.create(
+            user_id=user_id,
+            content_type_id=get_content_type_for_model(self.model).pk,
+            object_id=None,
+            object_repr=f"{changed:,} {self.opts.verbose_name_plural} with {search}"[:200],
+            action_flag=action_flag,
+            change_message=message,
+        )
+
+    def jobs_view(self, request):
+        """returns the active and the recently finished jobs of the user on this model as JSON"""
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        jobs = get_recent_jobs(self.model, request.user)
+        return JsonResponse({'jobs': [i.as_dict() for i in jobs]})
+
+    def job_view(self, request, job_id: int):
+        """returns the state and progress of one job as JSON, for polling"""
+        job = Job.objects.filter(pk=job_id, model=self.opts.label).first()
+        if job is None or (job.user_id != request.user.pk and not request.user.is_superuser):
+            raise Http404
+        return JsonResponse(job.as_dict())
+
+    def get_autocomplete_field(self, lookup: str):
+        """returns the field at the end of a search field lookup if it can be completed, else None"""
+        _, field = get_lookup_path(self.model, lookup)
+        if get_search_kind(field) != 'text' or self.search_match_modes.get(lookup) == 'fulltext':
+            return None
+        return field
+
+    def get_autocomplete_sql(self, field) -> str:
+        """
+        returns the query of the distinct values of a text field that start with a prefix.
+        It filters and orders on the search expression with the pattern operators, so the
+        `text_pattern_ops` index of `create_search_indexes` serves both, and the scan stops
+        after `autocomplete_limit` distinct values however many rows share the prefix.
+        A related field (`author__name`) is completed from its own, usually small, table.
+        """
+        table = field.model._meta.db_table
+        expression = get_search_expression(field.column, table)
+        return f"SELECT DISTINCT {expression} FROM {table} WHERE {expression} LIKE LOWER(%s::text) " \
+               f"ORDER BY {expression} USING ~<~ LIMIT {int(self.autocomplete_limit)}"
+
+    def search_autocomplete_view(self, request):
+        """
+        returns up to `autocomplete_limit` distinct values of the `mf` search field that start
+        with `term`, as JSON. Text fields only. The suggestions of a prefix are cached for
+        `autocomplete_cache_timeout` seconds, since many users type the same first letters.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        term = request.GET.get('term', '').strip()
+        mf = request.GET.get('mf', '')
+        if not mf.isdigit() or int(mf) >= len(self.search_fields):  # `-1` is no search field either
+            return JsonResponse({'results': []})
+        lookup = self.search_fields[int(mf)]
+        field = self.get_autocomplete_field(lookup)
+        if not self.autocomplete_limit or field is None or len(term) < self.autocomplete_min_length:
+            return JsonResponse({'results': []})
+
+        key = make_cache_key(
+            self.model, 'autocomplete',
+            field=lookup, term=term.lower(), limit=self.autocomplete_limit,
+            related_versions=[get_model_version(i) for i in get_related_models(self.model, lookup)],
+        )
+        results = cache.get(key)
+        if results is None:
+            using = self.get_search_database()
+            try:
+                with statement_timeout(self.query_timeout, using), connections[using].cursor() as cursor:
+                    cursor.execute(self.get_autocomplete_sql(field), [f'{escape_like(term)}%'])
+                    results = [row[0] for row in cursor.fetchall()]
+            except OperationalError as e:
+                if not is_query_canceled(e):
+                    raise
+                return JsonResponse({'results': []})
+            cache.set(key, results, self.autocomplete_cache_timeout)
+        return JsonResponse({'results': results})
+
+    async def async_changelist_view(self, request, extra_context=None):
+        """
+        builds the changelist in a thread like the sync view (permissions, actions, context),
+        then awaits its count and page queries on the async driver and renders it.
+        Requests other than a plain search, and admins with `list_editable`, whose
+        formset needs the rows while the changelist is built, take the sync view.
+        So do the requests of a WSGI server, which runs each of them on an event loop of its own.
+        """
+        request.bigrecord_async = isinstance(request, ASGIRequest) and request.method == 'GET' \
+            and bool(request.GET.get(SEARCH_VAR)) and not self.list_editable
+        view = self.admin_site.admin_view(self.changelist_view)
+        response = await sync_to_async(view)(request, extra_context)
+        cl = (getattr(response, 'context_data', None) or {}).get('cl')
+        if not isinstance(cl, AsyncSearchOnlyChangeList) or cl.searched_data is None:
+            return response
+
+        await cl.aget_results(request)
+        # the notes were made from the empty placeholder page
+        response.context_data.update({
+            'selection_note': _("0 of %(cnt)s selected") % {"cnt": len(cl.result_list)},
+            'selection_note_all': ngettext(
+                "%(total_count)s selected", "All %(total_count)s selected", cl.result_count
+            ) % {"total_count": cl.result_count},
+        })
+        return await sync_to_async(self.render_search)(request, response, cl)
+
+    def render_search(self, request, response, cl):
+        """
+        renders the changelist right away to time the template as well, then hands the
+        search timings to the debug toolbar panel and writes them as a log line.
+        """
+        with cl.timer('template_render'):
+            response.render()
+        request.bigrecord_search = stats = cl.get_search_stats()
+        logger.info(json.dumps({key: stats[key] for key in stats if key != 'explain'}, cls=DjangoJSONEncoder))
+        return response
+
 
 @admin.register(Book)
 class MyAdmin(OptimizedAdminSearchMixin, admin.ModelAdmin):
-    list_display = ['id', 'title', 'price']
+    list_display = ['id', 'title', 'price', 'author']
     default_sorting_key = 'title'
-    search_fields = ['id', 'title', 'price', 'author__name']
+    pagination_mode = 'keyset'
+    count_strategy = 'capped'
+    concurrent_count = True
+    search_fields = ['id', 'title', 'price', 'author__name', 'description']
+    search_match_modes = {'description': 'fulltext'}
+    autocomplete_limit = 10
 
 
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'model', 'user', 'status', 'progress', 'processed', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Sequence, Union
+from weakref import WeakKeyDictionary
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+try:
+    import psycopg
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # the async search is optional
+    psycopg = AsyncConnectionPool = None
+
+# keys of a database's OPTIONS that configure django's backend rather than libpq
+BACKEND_OPTIONS = ('isolation_level', 'server_side_binding', 'assume_role', 'pool', 'cursor_factory')
+
+# event loop -> database alias -> the async connection pool of the loop.
+# A pool belongs to the loop that opened it, and is dropped with it.
+_pools = WeakKeyDictionary()
+
+
+def get_conninfo(using: str = DEFAULT_DB_ALIAS) -> dict:
+    """returns the libpq connection parameters of a database of the DATABASES setting"""
+    settings_dict = connections[using].settings_dict
+    params = {
+        'dbname': settings_dict['NAME'],
+        'user': settings_dict['USER'],
+        'password': settings_dict['PASSWORD'],
+        'host': settings_dict['HOST'],
+        'port': settings_dict['PORT'],
+    }
+    params.update({
+        key: value for key, value in settings_dict['OPTIONS'].items() if key not in BACKEND_OPTIONS
+    })
+    return {key: value for key, value in params.items() if value not in (None, '')}
+
+
+async def get_pool(using: str = DEFAULT_DB_ALIAS) -> 'AsyncConnectionPool':
+    """
+    returns the async connection pool of a database on the running event loop, opened on
+    first use. It keeps up to the `BIGRECORD_ASYNC_POOL_SIZE` setting (4 by default)
+    connections, so a search does not pay for a new connection and its authentication.
+    Its connections and workers only run on the loop that opened it, so every loop has a
+    pool of its own. Under ASGI that is one pool per process.
+    """
+    if AsyncConnectionPool is None:
+        raise ImproperlyConfigured("The async search needs psycopg 3 and its pool: pip install 'psycopg[pool]'")
+
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get(using)
+    if pool is None:
+        pool = pools[using] = AsyncConnectionPool(
+            kwargs={'cursor_factory': psycopg.AsyncClientCursor, **get_conninfo(using)},
+            min_size=1,
+            max_size=getattr(settings, 'BIGRECORD_ASYNC_POOL_SIZE', 4),
+            open=False,
+        )
+    # opening an open pool does nothing, so a search that comes while it opens waits for it
+    await pool.open()
+    return pool
+
+
+async def fetch_all(
+        sql: str,
+        params: Sequence,
+        using: str = DEFAULT_DB_ALIAS,
+        timeout: Union[int, None] = None,
+) -> Union[tuple[list[str], list[tuple]], None]:
+    """
+    runs a query on a pooled async psycopg 3 connection, so the event loop serves
+    other requests while postgres works on it.
+    Placeholders are bound on the client side like django does, so the raw SQL of the
+    changelist runs unchanged.
+
+    param `timeout`: milliseconds the statement may take, see `utils.statement_timeout`.
+    returns the column names and the rows, or None when the statement was cancelled.
+    """
+    pool = await get_pool(using)
+    try:
+        async with pool.connection() as connection, connection.transaction(), connection.cursor() as cursor:
+            if timeout:
+                await cursor.execute("SET LOCAL statement_timeout = %s", [int(timeout)])
+            await cursor.execute(sql, params)
+            return [column.name for column in cursor.description], await cursor.fetchall()
+    except psycopg.errors.QueryCanceled:
+        return None
@@ -0,0 +1,101 @@
+from typing import Sequence, Union
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from .cache import invalidate_model_cache
+from .utils import get_search_kind
+
+
+def get_pk_range(
+        model: models.Model, where: str, params: Sequence, using: str = DEFAULT_DB_ALIAS
+) -> tuple[Union[int, None], Union[int, None]]:
+    """returns the lowest and the highest primary key of the rows that `where` matches"""
+    table = model._meta.db_table
+    pk = f'{table}.{model._meta.pk.column}'
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"SELECT MIN({pk}), MAX({pk}) FROM {table} WHERE {where}", params)
+        return cursor.fetchone()
+
+
+def get_bulk_delete_blockers(model: models.Model) -> list:
+    """
+    returns the relations whose rows point at `model`. A set-based `DELETE` skips django's
+    `on_delete` handling, so the rows of such a model must be deleted through the ORM.
+    """
+    opts = model._meta
+    return list(opts.related_objects) + list(opts.many_to_many)
+
+
+def run_in_batches(
+        model: models.Model,
+        statement: str,
+        statement_params: Sequence,
+        where: str,
+        params: Sequence,
+        using: str = DEFAULT_DB_ALIAS,
+        batch_size: int = 10000,
+        on_batch=None,
+) -> tuple[int, int]:
+    """
+    Runs a `DELETE` or `UPDATE` over the rows that a search predicate matches, `batch_size`
+    rows at a time. Each batch walks the matching keys after the last one it saw through the
+    primary key index, then changes exactly those rows with `WHERE pk = ANY(%s)`, so a batch
+    never scans a key range that holds few or no matches. Each batch is committed on its own,
+    so locks are held briefly and a failure only rolls the current batch back.
+
+    param `statement`: e.g. `DELETE FROM books_book` or `UPDATE books_book SET price = %s`
+    param `statement_params`: the parameters of `statement`
+    param `where`: the search predicate, see `SearchOnlyChangeList.get_where_clause`
+    param `on_batch`: optional callable that gets the number of rows changed so far and
+                   the share of the key range done (0 to 1)
+    returns the number of changed rows and of batches.
+    """
+    if get_search_kind(model._meta.pk) != 'integer':
+        raise ValueError(f"{model._meta.label} needs an integer primary key to be changed in batches")
+
+    low, high = get_pk_range(model, where, params, using)
+    if low is None:
+        return 0, 0
+
+    table = model._meta.db_table
+    pk = f'{table}.{model._meta.pk.column}'
+    keys_sql = f"SELECT {pk} FROM {table} WHERE ({where}) AND {pk} > %s ORDER BY {pk} LIMIT %s"
+    sql = f"{statement} WHERE {pk} = ANY(%s)"
+    changed = batches = 0
+    last = low - 1
+    try:
+        while True:
+            with transaction.atomic(using=using), connections[using].cursor() as cursor:
+                cursor.execute(keys_sql, [*params, last, batch_size])
+                keys = [row[0] for row in cursor.fetchall()]
+                if not keys:
+                    break
+                cursor.execute(sql, [*statement_params, keys])
+                changed += cursor.rowcount
+            batches += 1
+            last = keys[-1]
+            # set-based writes send no signals
+            invalidate_model_cache(model)
+            if on_batch is not None:
+                on_batch(changed, min((last - low + 1) / (high - low + 1), 1))
+            if len(keys) < batch_size:
+                break
+    finally:
+        invalidate_model_cache(model)
+    return changed, batches
+
+
+def bulk_delete(model: models.Model, where: str, params: Sequence, **kwargs) -> tuple[int, int]:
+    """deletes every row that `where` matches in batches, see `run_in_batches`"""
+    blockers = get_bulk_delete_blockers(model)
+    if blockers:
+        names = ', '.join(i.related_model._meta.label for i in blockers)
+        raise ValueError(f"{model._meta.label} is referenced by {names}; delete its rows through the ORM")
+    return run_in_batches(model, f"DELETE FROM {model._meta.db_table}", [], where, params, **kwargs)
+
+
+def bulk_update(
+        model: models.Model, field: models.Field, value, where: str, params: Sequence, **kwargs
+) -> tuple[int, int]:
+    """sets `field` to `value` on every row that `where` matches in batches, see `run_in_batches`"""
+    connection = connections[kwargs.get('using', DEFAULT_DB_ALIAS)]
+    statement = f"UPDATE {model._meta.db_table} SET {connection.ops.quote_name(field.column)} = %s"
+    return run_in_batches(model, statement, [field.get_db_prep_save(value, connection)], where, params, **kwargs)
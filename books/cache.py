@@ -0,0 +1,78 @@
+import hashlib
+import json
+import time
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+def get_version_key(model) -> str:
+    return f'bigrecord:version:{model._meta.label_lower}'
+
+
+def get_model_version(model) -> int:
+    """
+    returns the current cache version of a model. Every cache key made by
+    `make_cache_key` contains it, so bumping the version drops all of them at once.
+    """
+    version = cache.get(get_version_key(model))
+    if version is None:
+        # a time based version never repeats one that got evicted from the cache
+        cache.add(get_version_key(model), time.time_ns(), None)
+        version = cache.get(get_version_key(model), time.time_ns())
+    return version
+
+
+def invalidate_model_cache(model):
+    """
+    bumps the cache version of a model. Call it after writes that send no
+    signals, e.g. raw SQL or `COPY`.
+    """
+    cache.set(get_version_key(model), time.time_ns(), None)
+
+
+def invalidate_on_write(sender, **kwargs):
+    """receiver of `post_save` / `post_delete`"""
+    invalidate_model_cache(sender)
+
+
+def make_digest(value) -> str:
+    """returns a short, stable digest of a JSON serializable value"""
+    return hashlib.md5(json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def make_cache_key(model, kind: str, **parts) -> str:
+    """
+    param `model`: the model whose rows the cached value depends on
+    param `kind`: the kind of the cached value, e.g. `count`
+    param `parts`: whatever the cached value depends on besides the rows
+
+    example:
+    ```
+    >>> make_cache_key(Book, 'count', field='title', q='plant')
+    >>> 'bigrecord:count:books.book:1695043200000000000:5d41402abc4b2a76b9719d911017c592'
+    ```
+    """
+    return f'bigrecord:{kind}:{model._meta.label_lower}:{get_model_version(model)}:{make_digest(parts)}'
+
+
+class SearchCacheQuerySet(models.QuerySet):
+    """
+    Bulk writes send no signals, so this queryset bumps the cache version of
+    its model by itself. `delete()` sends `post_delete` for every object already.
+    """
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        invalidate_model_cache(self.model)
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        invalidate_model_cache(self.model)
+        return rows
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_model_cache(self.model)
+        return rows
@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Union
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_job_executor = None
+_background_slots = None
+# the pools are made on first use, which may happen on several request threads at once
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    returns the thread pool that runs queries next to the request thread.
+    Its size is set with the `BIGRECORD_QUERY_WORKERS` setting (4 by default).
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BIGRECORD_QUERY_WORKERS', 4),
+                thread_name_prefix='bigrecord',
+            )
+    return _executor
+
+
+def run_with_connection(func, *args, **kwargs):
+    """
+    runs `func` on the database connection of the current worker thread.
+    Django keeps one connection per thread, so every worker has its own one. Like a
+    request does, it is reused while `CONN_MAX_AGE` allows and closed afterwards,
+    which turns the long-lived workers into a small connection pool.
+    """
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def submit_query(func, *args, **kwargs) -> Future:
+    """runs `func` in the thread pool on a connection of its own"""
+    return get_executor().submit(run_with_connection, func, *args, **kwargs)
+
+
+def submit_background(func, *args, **kwargs) -> Union[Future, None]:
+    """
+    runs optional work like a prefetch in the thread pool, unless as many such tasks
+    as the `BIGRECORD_BACKGROUND_LIMIT` setting (2 by default) are running already.
+    The work is then dropped rather than queued in front of the queries of requests.
+    """
+    global _background_slots
+    with _lock:
+        if _background_slots is None:
+            _background_slots = threading.BoundedSemaphore(getattr(settings, 'BIGRECORD_BACKGROUND_LIMIT', 2))
+        slots = _background_slots
+    if not slots.acquire(blocking=False):
+        return None
+    try:
+        future = submit_query(func, *args, **kwargs)
+    except RuntimeError:  # the pool is shutting down
+        slots.release()
+        return None
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def get_job_executor() -> ThreadPoolExecutor:
+    """
+    returns the thread pool of background jobs (see `books.jobs`). It is separate from the
+    query pool, so a long job never delays the queries of requests.
+    Its size is set with the `BIGRECORD_JOB_WORKERS` setting (2 by default).
+    """
+    global _job_executor
+    with _lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BIGRECORD_JOB_WORKERS', 2),
+                thread_name_prefix='bigrecord-job',
+            )
+    return _job_executor
+
+
+def submit_job(func, *args, **kwargs) -> Future:
+    """runs `func` in the job pool on a connection of its own"""
+    return get_job_executor().submit(run_with_connection, func, *args, **kwargs)
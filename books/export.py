@@ -0,0 +1,57 @@
+import csv
+import json
+from typing import Iterable, Iterator, Sequence
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+
+class Echo:
+    """a file-like object whose `write` returns what it is given, so a csv writer makes strings"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_rows(sql: str, params: Sequence, using: str, batch_size: int = 2000) -> Iterator[list[tuple]]:
+    """
+    runs a query on a server-side (named) cursor, like `QuerySet.iterator()` does, and yields
+    its rows `batch_size` at a time, so a single batch is in memory however many rows match.
+    The cursor is opened in a transaction that lasts while the rows are read: in autocommit
+    mode django declares it `WITH HOLD`, which makes postgres materialize the whole result
+    at the first commit.
+    With `DISABLE_SERVER_SIDE_CURSORS` (e.g. behind pgbouncer) the driver reads the whole result.
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+            cursor = connection.cursor()
+        else:
+            cursor = connection.chunked_cursor()
+        with cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+
+def csv_lines(columns: Sequence[str], batches: Iterable[list[tuple]]) -> Iterator[str]:
+    """yields a header line, then one chunk of CSV lines per batch of rows"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for rows in batches:
+        yield ''.join(writer.writerow(row) for row in rows)
+
+
+def jsonl_lines(columns: Sequence[str], batches: Iterable[list[tuple]]) -> Iterator[str]:
+    """yields one chunk of JSON lines, an object per row, per batch of rows"""
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n' for row in rows)
+
+
+# export format -> (content type, line generator)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', csv_lines),
+    'jsonl': ('application/x-ndjson', jsonl_lines),
+}
@@ -0,0 +1,86 @@
+from django.contrib.admin.filters import AllValuesFieldListFilter, RelatedFieldListFilter
+from django.contrib.admin.utils import get_fields_from_path, reverse_field_path
+from django.core.cache import cache
+from django.db import models
+from .cache import make_cache_key
+
+
+def get_cached_choices(model: models.Model, field_path: str, model_admin, compute) -> list:
+    """
+    returns the choices of a filter from the shared cache, or computes them with `compute`
+    and caches them for `filter_cache_timeout` seconds (or until `model` is written to)
+    """
+    key = make_cache_key(
+        model, 'filter',
+        field=field_path,
+        limit=model_admin.filter_choices_limit,
+        sample=model_admin.filter_sample_size,
+    )
+    choices = cache.get(key)
+    if choices is None:
+        choices = compute()
+        cache.set(key, choices, model_admin.filter_cache_timeout)
+    return choices
+
+
+class BoundedRelatedFieldListFilter(RelatedFieldListFilter):
+    """
+    lists at most `filter_choices_limit` rows of the related model, cached,
+    instead of every row of a related table that may be big as well
+    """
+
+    def field_choices(self, field, request, model_admin):
+        related_model = field.related_model
+        # a stable order, so the same rows are listed on every computation
+        ordering = self.field_admin_ordering(field, request, model_admin) or \
+            related_model._meta.ordering or ('pk',)
+        attname = field.target_field.attname
+
+        def compute():
+            queryset = related_model._default_manager.complex_filter(field.get_limit_choices_to())
+            queryset = queryset.order_by(*ordering)[:model_admin.filter_choices_limit]
+            return [(getattr(obj, attname), str(obj)) for obj in queryset]
+
+        return get_cached_choices(related_model, self.field_path, model_admin, compute)
+
+
+class BoundedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """
+    lists the distinct values among the first `filter_sample_size` rows, at most
+    `filter_choices_limit` of them, cached. The stock filter runs a `DISTINCT` over the
+    whole table instead. A value that is missing from the sample can still be filtered on
+    through the URL.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        parent_model, _ = reverse_field_path(model, field_path)
+
+        def compute():
+            sample = parent_model._default_manager.order_by().values_list(field.name, flat=True)
+            values = set(sample[:model_admin.filter_sample_size])
+            has_none = None in values
+            values.discard(None)
+            choices = sorted(values)[:model_admin.filter_choices_limit]
+            return choices + [None] if has_none else choices
+
+        self.lookup_choices = get_cached_choices(parent_model, field_path, model_admin, compute)
+
+
+def get_bounded_list_filter(model: models.Model, item):
+    """
+    param `item`: an entry of `list_filter`
+    returns the entry with a bounded filter class for a field path whose stock filter would
+    read a whole table for its choices. Choices, boolean and date filters read nothing, and
+    explicit filter classes are left to the admin.
+    """
+    if not isinstance(item, str):
+        return item
+    field = get_fields_from_path(model, item)[-1]
+    if field.is_relation:
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            return item, BoundedRelatedFieldListFilter
+        return item
+    if field.flatchoices or isinstance(field, (models.BooleanField, models.DateField)):
+        return item
+    return item, BoundedAllValuesFieldListFilter
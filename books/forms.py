@@ -0,0 +1,19 @@
+from django import forms
+
+
+class BulkActionForm(forms.Form):
+    """the confirmation form of `OptimizedAdminSearchMixin.bulk_view`"""
+    operation = forms.ChoiceField(widget=forms.RadioSelect)
+    field = forms.ChoiceField(required=False, help_text="The field to set, for an update.")
+    value = forms.CharField(required=False, help_text="The new value of the field, for an update.")
+
+    def __init__(self, *args, operations: list, fields: list, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['operation'].choices = operations
+        self.fields['field'].choices = [('', '---------')] + [(i.name, i.verbose_name) for i in fields]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('operation') == 'update' and not cleaned_data.get('field'):
+            self.add_error('field', "Choose the field to update.")
+        return cleaned_data
@@ -0,0 +1,61 @@
+import logging
+from datetime import timedelta
+from django.db import models, transaction
+from django.utils import timezone
+from .executor import submit_job
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def start_job(kind: str, model: models.Model, user, func, *args, **kwargs) -> Job:
+    """
+    records a job and runs `func(*args, on_progress=..., **kwargs)` in the job pool once the
+    current transaction commits. `func` reports its progress by calling `on_progress` with the
+    number of rows processed so far and the share of the work done (0 to 1); the changelist
+    polls it. An int that `func` returns is stored as the final number of processed rows.
+    """
+    job = Job.objects.create(kind=kind, model=model._meta.label, user=user if user.is_authenticated else None)
+    transaction.on_commit(lambda: submit_job(run_job, job.pk, func, args, kwargs))
+    return job
+
+
+def update_job(job_id: int, **fields):
+    Job.objects.filter(pk=job_id).update(updated_at=timezone.now(), **fields)
+
+
+def run_job(job_id: int, func, args: tuple, kwargs: dict):
+    """runs a job in a worker thread and records its state; see `start_job`"""
+    update_job(job_id, status=Job.RUNNING)
+
+    def on_progress(processed: int, progress: float):
+        update_job(job_id, processed=processed, progress=progress)
+
+    try:
+        result = func(*args, on_progress=on_progress, **kwargs)
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        update_job(job_id, status=Job.FAILED, message=str(e), finished_at=timezone.now())
+        return
+
+    done = {'status': Job.DONE, 'progress': 1, 'finished_at': timezone.now()}
+    if isinstance(result, int):
+        done['processed'] = result
+    update_job(job_id, **done)
+
+
+def get_recent_jobs(model: models.Model, user, minutes: int = 10) -> list[Job]:
+    """
+    returns the jobs of a user on a model that are active or finished in the last `minutes`.
+    A stale job (see `Job.stale`) is listed like one that finished at its last report.
+    """
+    since = timezone.now() - timedelta(minutes=minutes)
+    jobs = Job.objects.filter(model=model._meta.label, user=user).order_by('-created_at')[:10]
+    recent = []
+    for job in jobs:
+        if job.stale:
+            if job.updated_at >= since:
+                recent.append(job)
+        elif job.active or (job.finished_at and job.finished_at >= since):
+            recent.append(job)
+    return recent
@@ -0,0 +1,127 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Sequence, Union
+import django
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from .cache import invalidate_model_cache
+from .utils import FakeRowFactory
+
+NULL = r'\N'
+
+# the row factory of a fake data worker process, see `init_fake_worker`
+_factory = None
+
+
+def get_copy_sql(model: models.Model, columns: Sequence[str], using: str = DEFAULT_DB_ALIAS) -> str:
+    """
+    param `columns`: field names or attnames (`author_id`) in the order of the row values
+    returns a `COPY ... FROM STDIN` statement for the table of `model`
+    """
+    quote = connections[using].ops.quote_name
+    opts = model._meta
+    column_list = ', '.join(quote(opts.get_field(i).column) for i in columns)
+    return f"COPY {quote(opts.db_table)} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')"
+
+
+def write_chunk(rows: Iterable[Sequence], chunk_size: int) -> tuple[io.StringIO, int]:
+    """
+    writes up to `chunk_size` rows into a CSV buffer, None becomes NULL.
+    returns the buffer and the number of rows in it.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    written = 0
+    for row in islice(rows, chunk_size):
+        writer.writerow([NULL if i is None else i for i in row])
+        written += 1
+    buffer.seek(0)
+    return buffer, written
+
+
+def copy_buffer(cursor, sql: str, buffer: io.StringIO):
+    if hasattr(cursor, 'copy_expert'):  # psycopg2
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def copy_rows(
+        model: models.Model,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+        chunk_size: int = 10000,
+        using: str = DEFAULT_DB_ALIAS,
+        on_chunk=None,
+) -> int:
+    """
+    Streams rows into the table of a model with `COPY ... FROM STDIN`.
+
+    param `columns`: field names or attnames of the row values; leave the primary key
+                   out to let its sequence number the rows.
+    param `rows`: any iterable of value sequences, usually a generator.
+    param `chunk_size`: rows per `COPY`. Only one chunk is held in memory, however
+                   many rows the generator yields.
+    param `on_chunk`: optional callable that gets the number of rows copied so far.
+    Each chunk is committed on its own unless an outer transaction is open.
+    returns the number of copied rows.
+    """
+    sql = get_copy_sql(model, columns, using)
+    rows = iter(rows)
+    total = 0
+    try:
+        while True:
+            buffer, written = write_chunk(rows, chunk_size)
+            if not written:
+                break
+            with connections[using].cursor() as cursor:
+                copy_buffer(cursor, sql, buffer)
+            total += written
+            if on_chunk is not None:
+                on_chunk(total)
+    finally:
+        # COPY sends no signals
+        invalidate_model_cache(model)
+    return total
+
+
+def read_csv_rows(path: str) -> tuple[list[str], Iterable[list[str]]]:
+    """
+    returns the header and a generator of the rows of a CSV file.
+    The header names the columns; write NULL as `\\N`.
+    """
+    f = open(path, newline='')
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        f.close()
+        raise ValueError(f"{path} has no header row")
+
+    def rows():
+        with f:
+            yield from reader
+
+    return header, rows()
+
+
+def init_fake_worker(model_label: str, seed: Union[int, None] = None):
+    """
+    initializer of a fake data worker process. A spawned process sets Django up
+    first; a forked one must not inherit open connections (close them before forking).
+    Every worker makes its own Faker once and opens its own database connection.
+    """
+    global _factory
+    if not apps.ready:
+        django.setup()
+    _factory = FakeRowFactory(apps.get_model(model_label), seed)
+
+
+def load_fake_chunk(chunk: int, how_many: int) -> int:
+    """
+    generates chunk number `chunk` of fake rows in this worker process and copies
+    it on the connection of the worker. returns the number of copied rows.
+    """
+    rows = _factory.rows(how_many, chunk)
+    return copy_rows(_factory.model, _factory.columns, rows, chunk_size=how_many)
@@ -0,0 +1,209 @@
+import json
+import random
+import statistics
+from time import perf_counter
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.test import RequestFactory
+from ...admin import OptimizedAdminSearchMixin
+from ...models import Book
+from ...utils import get_lookup_path, get_search_kind
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) == 1:
+        return {'p50_ms': round(samples[0], 3), 'p95_ms': round(samples[0], 3), 'p99_ms': round(samples[0], 3)}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50_ms': round(cuts[49], 3), 'p95_ms': round(cuts[94], 3), 'p99_ms': round(cuts[98], 3)}
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the search of an optimized admin against django's stock `ChangeList`.
+    Seeds the table up to `--rows` records, then times whole changelist requests
+    (SQL, count, page fetch and hydration) for every search field, predicate type,
+    page depth, count strategy and pagination mode, and reports p50/p95/p99 in JSON.
+    """
+    help = "Reports search latency percentiles of the optimized and the stock changelist as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default="books.Book",
+                            help="app_label.ModelName of an admin that uses OptimizedAdminSearchMixin.")
+        parser.add_argument("--rows", type=int, default=100000,
+                            help="Seeds the table up to this many records (books only).")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Worker processes used for seeding.")
+        parser.add_argument("--repeat", type=int, default=20,
+                            help="Timed requests per case.")
+        parser.add_argument("--pages", default="1,10,100",
+                            help="Comma separated page depths.")
+        parser.add_argument("--count-strategies", default="exact,capped,estimate")
+        parser.add_argument("--pagination", default="offset,keyset")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--output", help="Write the report into this file instead of stdout.")
+
+    def seed_table(self, model, rows, workers, seed):
+        if model is not Book:
+            return
+        existing = model.objects.count()
+        if existing < rows:
+            self.stderr.write(f"Seeding {rows - existing} records...")
+            call_command('create_fake_record', str(rows - existing), workers=workers, seed=seed,
+                         stdout=self.stderr)
+
+    def sample_row(self, model):
+        bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            raise CommandError(f"{model._meta.label} has no records to search for")
+        pk = self.random.randint(bounds['low'], bounds['high'])
+        return model.objects.filter(pk__gte=pk).order_by('pk').first()
+
+    def get_term(self, model, row, lookup: str, predicate: str) -> str:
+        """picks a search term from a real row, so every case has matches"""
+        value = model.objects.filter(pk=row.pk).values_list(lookup, flat=True).first()
+        _, field = get_lookup_path(model, lookup)
+        kind = get_search_kind(field)
+        if kind == 'integer':
+            return str(value)
+        if kind == 'number':
+            return str(int(value))
+        if kind == 'date':
+            return value.strftime('%Y-%m')
+
+        value = str(value)
+        if predicate == 'exact':
+            return value
+        if predicate == 'prefix':
+            return value[:4]
+        if predicate == 'fulltext':
+            return max(value.split(), key=len)
+        middle = max(len(value) // 2 - 2, 0)
+        return value[middle:middle + 4]
+
+    def get_predicates(self, model_admin, model, lookup: str) -> list[str]:
+        _, field = get_lookup_path(model, lookup)
+        kind = get_search_kind(field)
+        if kind != 'text':
+            return [kind]
+        predicates = ['contains', 'prefix', 'exact']
+        if model_admin.search_match_modes.get(lookup) == 'fulltext':
+            predicates.append('fulltext')
+        return predicates
+
+    def make_request(self, params: dict):
+        request = self.factory.get('/', params)
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        return request
+
+    def run_changelist(self, model_admin, params: dict):
+        """returns the changelist and the milliseconds of the request"""
+        request = self.make_request(params)
+        t0 = perf_counter()
+        cl = model_admin.get_changelist_instance(request)
+        list(cl.result_list)
+        return cl, (perf_counter() - t0) * 1000
+
+    def get_keyset_cursor(self, model_admin, offset_admin, params: dict, page: int) -> str:
+        """finds the cursor of a deep keyset page through the offset page before it (untimed)"""
+        previous, _ = self.run_changelist(offset_admin, {**params, 'p': page - 1})
+        rows = list(previous.result_list)
+        first, _ = self.run_changelist(model_admin, params)
+        return first.make_cursor('next', rows[-1]) if rows else ''
+
+    def time_case(self, model_admin, params: dict, repeat: int) -> dict:
+        samples = []
+        try:
+            self.run_changelist(model_admin, params)  # warm up
+            for _ in range(max(repeat, 1)):
+                samples.append(self.run_changelist(model_admin, params)[1])
+        except Exception as e:
+            return {'error': f'{type(e).__name__}: {e}'}
+        return percentiles(samples)
+
+    def make_admin(self, base_class, model, **overrides):
+        admin_class = type(f'Bench{base_class.__name__}', (base_class,), overrides)
+        return admin_class(model, admin.site)
+
+    def handle(self, *args, **options):
+        model = apps.get_model(options['model'])
+        model_admin = admin.site._registry.get(model)
+        if not isinstance(model_admin, OptimizedAdminSearchMixin):
+            raise CommandError(f"{model._meta.label} has no admin with OptimizedAdminSearchMixin")
+
+        self.random = random.Random(options['seed'])
+        self.factory = RequestFactory()
+        self.user = User(username='bench', is_active=True, is_staff=True, is_superuser=True)
+        self.seed_table(model, options['rows'], options['workers'], options['seed'])
+
+        pages = [int(i) for i in options['pages'].split(',')]
+        strategies = options['count_strategies'].split(',')
+        paginations = options['pagination'].split(',')
+        row = self.sample_row(model)
+        results = []
+
+        for index, lookup in enumerate(model_admin.search_fields):
+            predicates = self.get_predicates(model_admin, model, lookup)
+            _, field = get_lookup_path(model, lookup)
+
+            # the stock changelist searches every field with `icontains`
+            stock_admin = self.make_admin(
+                admin.ModelAdmin, model,
+                search_fields=[lookup], list_display=model_admin.list_display,
+                list_per_page=model_admin.list_per_page, show_full_result_count=False,
+            )
+            term = self.get_term(model, row, lookup, predicates[0])
+            self.stderr.write(f"Benchmarking {lookup} (stock) for {term!r}...")
+            for page in pages:
+                results.append({
+                    'changelist': 'stock', 'field': lookup, 'predicate': 'icontains', 'term': term, 'page': page,
+                    **self.time_case(stock_admin, {'q': term, 'p': page}, options['repeat']),
+                })
+
+            for predicate in predicates:
+                term = self.get_term(model, row, lookup, predicate)
+                match_modes = dict(model_admin.search_match_modes)
+                if get_search_kind(field) == 'text':
+                    match_modes[lookup] = predicate
+                self.stderr.write(f"Benchmarking {lookup} ({predicate}) for {term!r}...")
+
+                for strategy in strategies:
+                    variants = {
+                        pagination: self.make_admin(
+                            type(model_admin), model,
+                            pagination_mode=pagination, count_strategy=strategy,
+                            count_cache_timeout=0, page_cache_timeout=0, search_match_modes=match_modes,
+                        )
+                        for pagination in ('offset', 'keyset')
+                    }
+                    for page in pages:
+                        for pagination in paginations:
+                            params = {'q': term, 'mf': index}
+                            if pagination == 'offset':
+                                params['p'] = page
+                            elif page > 1:
+                                params['c'] = self.get_keyset_cursor(
+                                    variants['keyset'], variants['offset'], params, page)
+                            results.append({
+                                'changelist': 'optimized', 'field': lookup, 'predicate': predicate,
+                                'term': term, 'page': page, 'count_strategy': strategy, 'pagination': pagination,
+                                **self.time_case(variants[pagination], params, options['repeat']),
+                            })
+
+        report = json.dumps({
+            'model': model._meta.label,
+            'rows': options['rows'],
+            'repeat': options['repeat'],
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report)
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(report)
@@ -1,20 +1,72 @@
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
-from ...utils import  fake_field_creator
+from django.db import connections
+from ...loader import copy_rows, init_fake_worker, load_fake_chunk
+from ...models import Author
+from ...utils import FakeRowFactory, generate_random_string
+from random import Random
 from time import time
 
+
 class Command(BaseCommand):
     """
-    Command to create fake records in the database as many as passed arguments
+    Command to create fake records in the database as many as passed arguments.
+    Users and authors are made first; the books are then generated and copied in
+    chunks by a pool of worker processes, each with one Faker and its own connection.
     """
     def add_arguments(self, parser):
         parser.add_argument("how_many", nargs="+", type=int)
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Number of worker processes.")
+        parser.add_argument("--chunk-size", type=int, default=10000,
+                            help="Books generated and copied per task.")
+        parser.add_argument("--seed", type=int, default=None,
+                            help="Makes the generated records reproducible.")
+        parser.add_argument("--authors", type=int, default=None,
+                            help="Number of users and authors to create first "
+                                 "(defaults to how_many, at most 1000).")
+
+    def create_authors(self, how_many, seed):
+        rng = Random(seed)
+        users = (User(username=f'fake-{generate_random_string(rng)}', password='!') for _ in range(how_many))
+        User.objects.bulk_create(users, batch_size=1000, ignore_conflicts=True)
+        factory = FakeRowFactory(Author, seed)
+        copy_rows(Author, factory.columns, factory.rows(how_many))
 
     def handle(self, *args, **options):
         self.stdout.write("Creating fake records...")
         how_many = options['how_many'][0]
+        chunk_size = options['chunk_size']
+        authors = options['authors'] if options['authors'] is not None else min(how_many, 1000)
 
         t0 = time()
-        fake_field_creator(how_many)
+        if authors:
+            self.create_authors(authors, options['seed'])
+
+        chunks = [
+            (i, min(chunk_size, how_many - i * chunk_size))
+            for i in range((how_many + chunk_size - 1) // chunk_size)
+        ]
+        created = 0
+        if options['workers'] <= 1:
+            init_fake_worker('books.Book', options['seed'])
+            for chunk, size in chunks:
+                created += load_fake_chunk(chunk, size)
+                self.stdout.write(f"{created} records created", ending='\r')
+        else:
+            # forked workers must open connections of their own
+            connections.close_all()
+            with ProcessPoolExecutor(
+                    max_workers=options['workers'],
+                    initializer=init_fake_worker,
+                    initargs=('books.Book', options['seed']),
+            ) as pool:
+                futures = [pool.submit(load_fake_chunk, chunk, size) for chunk, size in chunks]
+                for future in as_completed(futures):
+                    created += future.result()
+                    self.stdout.write(f"{created} records created", ending='\r')
+
         delta = round(time() - t0 ,2)
-        self.stdout.write(f"{how_many} records created successfully in {delta} seconds!")
+        self.stdout.write(f"{created} records created successfully in {delta} seconds!")
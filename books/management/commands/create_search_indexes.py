@@ -0,0 +1,76 @@
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.utils import truncate_name
+from ...admin import OptimizedAdminSearchMixin
+from ...utils import get_search_expression, get_search_kind, get_lookup_path
+
+
+class Command(BaseCommand):
+    """
+    Creates an index for every `search_fields` entry of the admins that use
+    `OptimizedAdminSearchMixin`. Text fields get a pg_trgm GIN index on the exact expression
+    the search predicates are built on, so `LIKE '%q%'` (at least 3 characters) becomes an
+    index scan. Numbers and dates get a B-tree index for their equality and range predicates,
+    unless the field already has one as a primary key, a unique or a `db_index` field.
+    Text fields of admins with search box autocompletion also get a `text_pattern_ops` B-tree
+    index, which serves the ordered prefix scans of the suggestions.
+    """
+    help = "Creates trigram indexes for the search fields of the optimized admins"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*",
+            help="app_label.ModelName of the admins to index. Defaults to all of them."
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only print the SQL statements."
+        )
+
+    def get_index_statements(self, labels):
+        quote = connection.ops.quote_name
+        for model, model_admin in admin.site._registry.items():
+            if not isinstance(model_admin, OptimizedAdminSearchMixin):
+                continue
+            if labels and model._meta.label not in labels:
+                continue
+
+            for field_name in model_admin.search_fields:
+                # a related lookup is searched on the table at the end of its path
+                _, field = get_lookup_path(model, field_name)
+                table = field.model._meta.db_table
+                if model_admin.search_match_modes.get(field_name) == 'fulltext':
+                    self.stdout.write(f"Skipping {model._meta.label}.{field_name}: "
+                                      f"it is indexed by its search vector migration")
+                    continue
+                if get_search_kind(field) == 'text':
+                    name = f"{table}_{field.column}_trgm"
+                    method = f"gin (({get_search_expression(field.column)}) gin_trgm_ops)"
+                    if model_admin.autocomplete_limit:
+                        prefix_name = truncate_name(f"{table}_{field.column}_prefix", connection.ops.max_name_length())
+                        yield f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(prefix_name)} ON {quote(table)} " \
+                              f"USING btree (({get_search_expression(field.column)}) text_pattern_ops)"
+                elif field.primary_key or field.unique or field.db_index:
+                    # the index that comes with the field serves the equality and range predicates
+                    continue
+                else:
+                    # numbers and dates are searched with equality and range predicates
+                    name = f"{table}_{field.column}_btree"
+                    method = f"btree ({quote(field.column)})"
+
+                name = truncate_name(name, connection.ops.max_name_length())
+                yield f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} ON {quote(table)} USING {method}"
+
+    def handle(self, *args, **options):
+        statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        statements += self.get_index_statements(options['models'])
+
+        for sql in statements:
+            self.stdout.write(sql)
+            if options['dry_run']:
+                continue
+            # CONCURRENTLY cannot run inside a transaction, the default autocommit mode is needed
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+        self.stdout.write(f"{len(statements) - 1} search indexes processed.")
@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from time import time
+from ...loader import copy_rows, read_csv_rows
+from ...utils import fake_rows
+
+
+class Command(BaseCommand):
+    """
+    Command to stream records into a table with `COPY ... FROM STDIN`.
+    Either fake rows (`Author` and `Book`) or the rows of a CSV file are loaded
+    in fixed-size chunks, so the memory use does not grow with the number of rows.
+    """
+    help = "Loads fake or CSV records into a table with COPY"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="app_label.ModelName, e.g. books.Book")
+        parser.add_argument("how_many", nargs="?", type=int, default=0,
+                            help="Number of fake records to load.")
+        parser.add_argument("--csv", dest="csv_path",
+                            help="Load this CSV file instead; its header row names the columns.")
+        parser.add_argument("--chunk-size", type=int, default=10000,
+                            help="Rows per COPY statement.")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+
+        try:
+            if options['csv_path']:
+                columns, rows = read_csv_rows(options['csv_path'])
+            elif options['how_many'] > 0:
+                columns, rows = fake_rows(model, options['how_many'])
+            else:
+                raise CommandError("Pass how_many fake records or --csv.")
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        self.stdout.write(f"Loading records into {model._meta.db_table}...")
+        t0 = time()
+        loaded = copy_rows(
+            model, columns, rows, options['chunk_size'],
+            on_chunk=lambda total: self.stdout.write(f"{total} records loaded", ending='\r'),
+        )
+        delta = round(time() - t0, 2)
+        rate = round(loaded / delta * 60) if delta else loaded
+        self.stdout.write(f"{loaded} records loaded successfully in {delta} seconds ({rate} per minute)!")
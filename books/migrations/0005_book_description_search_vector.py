@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_delete_authgroup_delete_authgrouppermissions_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "ALTER TABLE books_book ADD COLUMN description_tsv tsvector GENERATED ALWAYS AS "
+                "(to_tsvector('english', coalesce(description::text, ''))) STORED",
+                "CREATE INDEX books_book_description_tsv_gin ON books_book USING gin (description_tsv)",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS books_book_description_tsv_gin",
+                "ALTER TABLE books_book DROP COLUMN IF EXISTS description_tsv",
+            ],
+        ),
+    ]
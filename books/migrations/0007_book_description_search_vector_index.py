@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('books', '0006_job'),
+    ]
+
+    # a no-op where 0005 built the index
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS books_book_description_tsv_gin "
+                "ON books_book USING gin (description_tsv)",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS books_book_description_tsv_gin",
+        ),
+    ]
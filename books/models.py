@@ -1,11 +1,20 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .cache import SearchCacheQuerySet
 
 
 class Author(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=32)
 
+    objects = SearchCacheQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
 
 class Book(models.Model):
     title = models.CharField(max_length=100, verbose_name='Book Title')
@@ -17,5 +26,57 @@ class Book(models.Model):
     description = models.TextField(verbose_name='Description')
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
 
+    objects = SearchCacheQuerySet.as_manager()
+
     def __str__(self):
         return self.title
+
+
+class Job(models.Model):
+    """a long admin operation run in the background by `books.jobs`, with its progress"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=32, verbose_name='Kind')
+    model = models.CharField(max_length=100, verbose_name='Model')
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING, verbose_name='Status')
+    progress = models.FloatField(default=0, verbose_name='Progress')  # 0 to 1
+    processed = models.BigIntegerField(default=0, verbose_name='Processed Rows')
+    message = models.TextField(blank=True, verbose_name='Message')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finished At')
+
+    def __str__(self):
+        return f'{self.kind} on {self.model} ({self.status})'
+
+    @property
+    def active(self) -> bool:
+        return self.status in (self.PENDING, self.RUNNING)
+
+    @property
+    def stale(self) -> bool:
+        """
+        whether an active job has not reported for the `BIGRECORD_JOB_STALE_AFTER` setting
+        (600 seconds by default), e.g. because the process that ran it stopped
+        """
+        stale_after = timedelta(seconds=getattr(settings, 'BIGRECORD_JOB_STALE_AFTER', 600))
+        return self.active and self.updated_at < timezone.now() - stale_after
+
+    def as_dict(self) -> dict:
+        return {
+            'id': self.pk,
+            'kind': self.kind,
+            'model': self.model,
+            'status': self.status,
+            'stale': self.stale,
+            'progress': self.progress,
+            'processed': self.processed,
+            'message': self.message,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
@@ -0,0 +1,22 @@
+from debug_toolbar.panels import Panel
+
+
+class SearchPanel(Panel):
+    """
+    Debug toolbar panel showing where a big-record search spent its time:
+    SQL build, count query, page query, model hydration and template render,
+    plus the page SQL and its `EXPLAIN (ANALYZE, BUFFERS)` plan with `explain_search`.
+    Add `books.panels.SearchPanel` to `DEBUG_TOOLBAR_PANELS` to use it.
+    """
+    title = "Big-record search"
+    template = "debug_toolbar/panels/bigrecord_search.html"
+
+    @property
+    def nav_subtitle(self):
+        search = self.get_stats().get('search')
+        if not search:
+            return "No search"
+        return f"{search['total_ms']:.1f} ms"
+
+    def generate_stats(self, request, response):
+        self.record_stats({'search': getattr(request, 'bigrecord_search', None)})
@@ -0,0 +1,77 @@
+import random
+from typing import Sequence, Union
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# seconds a database is behind its primary; a replica that replayed all it received is not behind,
+# however long ago its last transaction was. A replica that is not streaming from its primary
+# has received nothing new to compare with, so its lag is unknown (NULL).
+REPLICATION_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def probe_replication_lag(using: str):
+    """
+    runs `REPLICATION_LAG_SQL` on a connection of its own that gives up connecting after
+    the `BIGRECORD_REPLICA_CONNECT_TIMEOUT` setting (2 seconds by default), so an unreachable
+    replica does not hold the request for the operating system's TCP timeout
+    """
+    wrapper = connections[using]
+    params = wrapper.get_connection_params()
+    params['connect_timeout'] = getattr(settings, 'BIGRECORD_REPLICA_CONNECT_TIMEOUT', 2)
+    with wrapper.wrap_database_errors:
+        connection = wrapper.get_new_connection(params)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(REPLICATION_LAG_SQL)
+                return cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+
+def get_replication_lag(using: str) -> Union[float, None]:
+    """
+    returns how many seconds the database `using` is behind its primary, 0 for the primary
+    itself, or None when it cannot be reached or its lag is unknown.
+    The answer is cached for the `BIGRECORD_REPLICA_CHECK_INTERVAL` setting (5 seconds by
+    default), so only a few requests pay for a check.
+    """
+    key = f'bigrecord:replication-lag:{using}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['lag']
+
+    try:
+        lag = probe_replication_lag(using)
+    except DatabaseError:
+        lag = None
+    lag = None if lag is None else float(lag)
+    cache.set(key, {'lag': lag}, getattr(settings, 'BIGRECORD_REPLICA_CHECK_INTERVAL', 5))
+    return lag
+
+
+def select_database(aliases: Union[str, Sequence[str], None], max_lag: float) -> str:
+    """
+    param `aliases`: a database alias or a list of them, usually read replicas
+    param `max_lag`: seconds a database may be behind its primary to be chosen
+    returns one of the databases that can be reached and are recent enough, picked at
+    random to spread the load, or the default database when there is none.
+    """
+    if not aliases:
+        return DEFAULT_DB_ALIAS
+    if isinstance(aliases, str):
+        aliases = [aliases]
+
+    healthy = []
+    for alias in aliases:
+        lag = get_replication_lag(alias)
+        if lag is not None and lag <= max_lag:
+            healthy.append(alias)
+    return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
@@ -1,3 +1,684 @@
-from django.test import TestCase
+import csv
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib import admin
+from django.contrib.admin.models import LogEntry, CHANGE
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.auth.models import User
+from django.core import signing
+from django.db import DataError, OperationalError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from . import async_db
+from .admin import ALL_FIELDS, AsyncSearchOnlyChangeList, MyAdmin, SearchOnlyChangeList
+from .bulk import bulk_delete, bulk_update, run_in_batches
+from .cache import get_model_version, invalidate_model_cache, make_cache_key
+from .jobs import get_recent_jobs, run_job, start_job
+from .models import Author, Book, Job
+from .utils import (
+    decode_cursor, encode_cursor, escape_like, get_lookup_path, is_query_canceled, parse_date_range, parse_number_range,
+    statement_timeout,
+)
 
-# Create your tests here.
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_books(prices: list) -> list:
+    author = Author.objects.create(user=User.objects.create(username='writer'), name='Ann')
+    return [
+        Book.objects.create(title=f'plant {i}', publication_date=date(2023, 9, 18), price=price,
+                            description='', author=author)
+        for i, price in enumerate(prices)
+    ]
+
+
+class CursorTests(SimpleTestCase):
+    payload = {'direction': 'next', 'search': ['plant', 'title', ''], 'ordering': ['title', 'ASC'],
+               'values': ['plant 15', 15]}
+
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(self.payload)), self.payload)
+
+    def test_tampered_cursor_is_rejected(self):
+        token = encode_cursor(self.payload)
+        tampered = token[:-1] + ('A' if token[-1] != 'A' else 'B')
+        self.assertIsNone(decode_cursor(tampered))
+        self.assertIsNone(decode_cursor('not a cursor'))
+
+    def test_cursor_of_another_salt_is_rejected(self):
+        self.assertIsNone(decode_cursor(signing.dumps(self.payload)))
+
+
+class ChangeListTestCase(TestCase):
+    admin_class = MyAdmin
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_request(self, **params):
+        request = RequestFactory().get('/admin/books/book/', params)
+        request.user = self.user
+        return request
+
+    def get_changelist(self, model_admin=None, **params):
+        """builds the search of a changelist request without reading a page"""
+        request = self.get_request(**params)
+        request.bigrecord_query_only = True
+        model_admin = model_admin or self.admin_class(Book, admin.site)
+        return model_admin.get_changelist_instance(request)
+
+
+class KeysetPaginationTests(ChangeListTestCase):
+    def get_books(self, first: int, count: int) -> list:
+        return [Book(pk=i, title=f'plant {i:02}') for i in range(first, first + count)]
+
+    def test_keyset_cursors_round_trip(self):
+        cl = self.get_changelist(q='plant', mf='1')
+        per_page = cl.list_per_page
+        page = cl.paginate_keyset(self.get_books(1, per_page + 1))
+        self.assertEqual(len(page), per_page)
+        self.assertIsNone(cl.prev_cursor)
+        cursor = cl.get_cursor(cl.next_cursor, 'plant')
+        self.assertEqual(cursor['direction'], 'next')
+        self.assertEqual(cursor['values'], [page[-1].title, page[-1].pk])
+
+        # the second and last page
+        cl = self.get_changelist(q='plant', mf='1', c=cl.next_cursor)
+        self.assertEqual(cl.cursor, cursor)
+        self.assertEqual(cl.page_sql.count('%s'), len(cl.page_params))
+        page = cl.paginate_keyset(self.get_books(per_page + 1, 3))
+        self.assertIsNone(cl.next_cursor)
+        cursor = cl.get_cursor(cl.prev_cursor, 'plant')
+        self.assertEqual(cursor['direction'], 'prev')
+        self.assertEqual(cursor['values'], [page[0].title, page[0].pk])
+
+        # back to the first page, whose rows come in reverse order
+        cl = self.get_changelist(q='plant', mf='1', c=cl.prev_cursor)
+        page = cl.paginate_keyset(self.get_books(1, per_page)[::-1])
+        self.assertEqual([i.pk for i in page], list(range(1, per_page + 1)))
+        self.assertEqual(cl.get_cursor(cl.next_cursor, 'plant')['values'], [page[-1].title, page[-1].pk])
+
+    def test_cursor_of_another_search_is_ignored(self):
+        cl = self.get_changelist(q='plant', mf='1')
+        cl.paginate_keyset(self.get_books(1, cl.list_per_page + 1))
+        self.assertIsNone(self.get_changelist(q='plants', mf='1', c=cl.next_cursor).cursor)
+        self.assertIsNone(self.get_changelist(q='plant', mf='4', c=cl.next_cursor).cursor)
+        self.assertIsNone(self.get_changelist(q='plant', mf='1', o='-2', c=cl.next_cursor).cursor)
+
+
+class OffsetPaginationTests(ChangeListTestCase):
+    admin_class = type('OffsetBookAdmin', (MyAdmin,), {'pagination_mode': 'offset'})
+
+    def test_page_before_the_first_is_the_first(self):
+        for page in ('0', '-3'):
+            cl = self.get_changelist(q='plant', mf='1', p=page)
+            self.assertEqual(cl.page_num, 1)
+            self.assertTrue(cl.page_sql.endswith(' OFFSET 0'), cl.page_sql)
+
+
+class ParseNumberRangeTests(SimpleTestCase):
+    def test_range_at_the_typed_precision(self):
+        self.assertEqual(parse_number_range('42'), (Decimal('42'), Decimal('43')))
+        self.assertEqual(parse_number_range(' 42.5 '), (Decimal('42.5'), Decimal('42.6')))
+        self.assertEqual(parse_number_range('42.50'), (Decimal('42.50'), Decimal('42.51')))
+
+    def test_negative_number_range_is_mirrored(self):
+        self.assertEqual(parse_number_range('-42'), (Decimal('-43'), Decimal('-42')))
+        self.assertEqual(parse_number_range('-42.5'), (Decimal('-42.6'), Decimal('-42.5')))
+
+    def test_no_number(self):
+        for value in ('abc', '', 'NaN', 'Infinity'):
+            self.assertIsNone(parse_number_range(value), value)
+
+
+class ParseDateRangeTests(SimpleTestCase):
+    def test_day_month_and_year(self):
+        self.assertEqual(parse_date_range('2023-09-18'), (date(2023, 9, 18), date(2023, 9, 19)))
+        self.assertEqual(parse_date_range('2023-09'), (date(2023, 9, 1), date(2023, 10, 1)))
+        self.assertEqual(parse_date_range('2023-12'), (date(2023, 12, 1), date(2024, 1, 1)))
+        self.assertEqual(parse_date_range(' 2023 '), (date(2023, 1, 1), date(2024, 1, 1)))
+
+    def test_no_date(self):
+        for value in ('abc', '2023-13', '2023-02-30', '9999'):
+            self.assertIsNone(parse_date_range(value), value)
+
+
+class EscapeLikeTests(SimpleTestCase):
+    def test_wildcards_are_escaped(self):
+        self.assertEqual(escape_like('50%'), '50\\%')
+        self.assertEqual(escape_like('a_b'), 'a\\_b')
+        self.assertEqual(escape_like('c:\\'), 'c:\\\\')
+        self.assertEqual(escape_like('plant'), 'plant')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FieldPredicateTests(ChangeListTestCase):
+    def search(self, q: str, mf: str) -> list:
+        return sorted(i.price for i in self.get_changelist(q=q, mf=mf).queryset)
+
+    def test_number_matches_at_the_typed_precision(self):
+        create_books([41.5, 42, 42.5, 43, -41.5, -42, -42.5, -43])
+        self.assertEqual(self.search('42', '2'), [42, 42.5])
+        self.assertEqual(self.search('-42', '2'), [-42.5, -42])
+        self.assertEqual(self.search('42.5', '2'), [42.5])
+        self.assertEqual(self.search('abc', '2'), [])
+
+    def test_like_wildcards_are_literal(self):
+        create_books([1])
+        Book.objects.update(title='50% off')
+        self.assertEqual(self.search('50%', '1'), [1])
+        self.assertEqual(self.search('5_%', '1'), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class JoinClauseTests(SimpleTestCase):
+    clause = 'name = %s '
+
+    def test_one_semi_join_per_relation(self):
+        paths, _ = get_lookup_path(Book, 'author__name')
+        self.assertEqual(
+            SearchOnlyChangeList.get_join_clause(paths, self.clause),
+            'books_book.author_id IN (SELECT books_author.id FROM books_author WHERE name = %s ) ',
+        )
+        paths, _ = get_lookup_path(Book, 'author__user__username')
+        self.assertEqual(
+            SearchOnlyChangeList.get_join_clause(paths, self.clause),
+            'books_book.author_id IN (SELECT books_author.id FROM books_author WHERE '
+            'books_author.user_id IN (SELECT auth_user.id FROM auth_user WHERE name = %s ) ) ',
+        )
+
+
+class RelatedFieldSearchTests(ChangeListTestCase):
+    def test_related_field_is_searched_through_the_semi_join(self):
+        books = create_books([1, 2])
+        other = Author.objects.create(user=User.objects.create(username='other'), name='Bob')
+        Book.objects.filter(pk=books[1].pk).update(author=other)
+        cl = self.get_changelist(q='bo', mf='3')
+        self.assertIn('IN (SELECT books_author.id FROM books_author WHERE ', cl.page_sql)
+        self.assertEqual([i.pk for i in cl.queryset], [books[1].pk])
+
+
+class MakeCacheKeyTests(SimpleTestCase):
+    def test_same_parts_make_the_same_key(self):
+        self.assertEqual(
+            make_cache_key(Book, 'count', field='title', q='plant'),
+            make_cache_key(Book, 'count', q='plant', field='title'),
+        )
+
+    def test_parts_kind_and_model_tell_keys_apart(self):
+        key = make_cache_key(Book, 'count', field='title', q='plant')
+        self.assertNotEqual(key, make_cache_key(Book, 'count', field='title', q='plants'))
+        self.assertNotEqual(key, make_cache_key(Book, 'page', field='title', q='plant'))
+        self.assertNotEqual(key, make_cache_key(Author, 'count', field='title', q='plant'))
+
+    def test_invalidation_changes_the_key(self):
+        key = make_cache_key(Book, 'count', field='title', q='plant')
+        invalidate_model_cache(Book)
+        self.assertNotEqual(key, make_cache_key(Book, 'count', field='title', q='plant'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CountCacheTests(ChangeListTestCase):
+    def test_count_is_shared_until_the_model_is_written(self):
+        books = create_books([1, 2])
+        self.assertEqual(self.get_changelist(q='plant', mf='1').get_search_result_count('plant'), 2)
+        cl = self.get_changelist(q='PLANT', mf='1')
+        with self.assertNumQueries(0):
+            self.assertEqual(cl.get_search_result_count('PLANT'), 2)
+
+        books[0].delete()
+        self.assertEqual(self.get_changelist(q='plant', mf='1').get_search_result_count('plant'), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CountStrategyTests(ChangeListTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_books(range(40))
+
+    def search(self, **attrs):
+        model_admin = type('CountBookAdmin', (MyAdmin,), {
+            'pagination_mode': 'offset', 'concurrent_count': False, **attrs,
+        })(Book, admin.site)
+        return model_admin.get_changelist_instance(self.get_request(q='plant', mf='1'))
+
+    def test_exact_count(self):
+        cl = self.search(count_strategy='exact')
+        self.assertEqual(cl.search_result_count_display, '40')
+        self.assertEqual(len(cl.result_list), cl.list_per_page)
+        self.assertEqual(cl.paginator.num_pages, 3)
+        self.assertTrue(cl.multi_page)
+
+    def test_capped_count(self):
+        cl = self.search(count_strategy='capped', count_cap=30)
+        self.assertFalse(cl.search_result_count_exact)
+        self.assertEqual(cl.search_result_count_display, '30+')
+        self.assertFalse(cl.can_show_all)
+        self.assertEqual(self.search(count_strategy='capped', count_cap=40).search_result_count_display, '40')
+
+    def test_estimated_count(self):
+        cl = self.search(count_strategy='estimate')
+        self.assertFalse(cl.search_result_count_exact)
+        self.assertTrue(cl.search_result_count_display.startswith('~'))
+
+    def test_pages_past_the_capped_count_are_rendered(self):
+        self.client.force_login(self.user)
+        cap = 30
+        with mock.patch.multiple(MyAdmin, pagination_mode='offset', concurrent_count=False, count_cap=cap):
+            # the page after the counted ones, and one past every row
+            for page in (cap // MyAdmin.list_per_page + 1, 10):
+                response = self.client.get(reverse('admin:books_book_changelist'), {'q': 'plant', 'mf': '1', 'p': page})
+                self.assertEqual(response.status_code, 200, page)
+                self.assertContains(response, '30+ Records')
+        self.assertEqual(len(response.context['cl'].result_list), 0)
+
+
+class StatementTimeoutTests(TestCase):
+    def get_timeout(self) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('statement_timeout')")
+            return cursor.fetchone()[0]
+
+    def test_statement_over_the_budget_is_canceled(self):
+        with self.assertRaises(OperationalError) as error:
+            with statement_timeout(10), connection.cursor() as cursor:
+                cursor.execute("SELECT pg_sleep(1)")
+        self.assertTrue(is_query_canceled(error.exception))
+
+    def test_setting_is_restored_after_a_nested_block(self):
+        # a test runs in a transaction, so the block is nested
+        previous = self.get_timeout()
+        with statement_timeout(5000):
+            self.assertEqual(self.get_timeout(), '5s')
+        self.assertEqual(self.get_timeout(), previous)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryTimeoutTests(ChangeListTestCase):
+    def test_slow_search_shows_an_empty_page_without_a_count(self):
+        create_books([1, 2])
+        where = SearchOnlyChangeList.get_where_clause
+
+        def slow_where(cl, searched_data):
+            # every row takes longer than the whole budget
+            return f'(SELECT true FROM pg_sleep(0.05)) AND {where(cl, searched_data)}'
+
+        self.client.force_login(self.user)
+        with mock.patch.multiple(MyAdmin, query_timeout=10, concurrent_count=False), \
+                mock.patch.object(SearchOnlyChangeList, 'get_where_clause', slow_where):
+            response = self.client.get(reverse('admin:books_book_changelist'), {'q': 'plant', 'mf': '1'})
+        cl = response.context['cl']
+        self.assertEqual(cl.result_list, [])
+        self.assertFalse(cl.search_result_count_available)
+        self.assertContains(response, 'Count unavailable')
+        self.assertContains(response, 'The search took too long and was cancelled.')
+
+
+class HydrationTests(ChangeListTestCase):
+    admin_class = type('SyncCountBookAdmin', (MyAdmin,), {'concurrent_count': False, 'count_cache_timeout': 0})
+
+    def test_related_instances_come_with_the_page(self):
+        author = create_books([1, 2, 3])[0].author
+        cl = self.get_changelist(q='plant', mf='1')
+        with self.assertNumQueries(1):
+            rows = cl.fetch_page(self.get_request(), cl.queryset)
+        with self.assertNumQueries(0):
+            self.assertEqual([(obj.author.pk, obj.author.name) for obj in rows], [(author.pk, 'Ann')] * 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PageCacheTests(ChangeListTestCase):
+    def search(self):
+        model_admin = type('PageCacheBookAdmin', (MyAdmin,), {
+            'concurrent_count': False, 'page_cache_timeout': 60,
+        })(Book, admin.site)
+        return model_admin.get_changelist_instance(self.get_request(q='plant', mf='1', o='-2'))
+
+    def test_repeated_page_is_read_by_its_primary_keys(self):
+        create_books([1, 2, 3])
+        cl = self.search()
+        self.assertFalse(cl.page_cache_hit)
+        pks = [obj.pk for obj in cl.result_list]
+
+        cl = self.search()
+        self.assertTrue(cl.page_cache_hit)
+        self.assertEqual([obj.pk for obj in cl.result_list], pks)
+
+    def test_write_to_the_model_misses_the_cache(self):
+        books = create_books([1, 2, 3])
+        self.search()
+        books[0].save()
+        self.assertFalse(self.search().page_cache_hit)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AutocompleteTests(ChangeListTestCase):
+    def complete(self, model_admin=None, **params) -> list:
+        model_admin = model_admin or MyAdmin(Book, admin.site)
+        return json.loads(model_admin.search_autocomplete_view(self.get_request(**params)).content)['results']
+
+    def test_sql_reads_distinct_prefixed_values_in_index_order(self):
+        model_admin = MyAdmin(Book, admin.site)
+        self.assertEqual(
+            model_admin.get_autocomplete_sql(model_admin.get_autocomplete_field('title')),
+            'SELECT DISTINCT LOWER(books_book.title::text) FROM books_book '
+            'WHERE LOWER(books_book.title::text) LIKE LOWER(%s::text) '
+            'ORDER BY LOWER(books_book.title::text) USING ~<~ LIMIT 10',
+        )
+        self.assertIn(' FROM books_author ', model_admin.get_autocomplete_sql(
+            model_admin.get_autocomplete_field('author__name')))
+
+    def test_only_plain_text_fields_are_completed(self):
+        model_admin = MyAdmin(Book, admin.site)
+        for lookup in ('id', 'price', 'description'):
+            self.assertIsNone(model_admin.get_autocomplete_field(lookup), lookup)
+
+    def test_suggestions_start_with_the_term(self):
+        create_books([1, 2, 3])
+        Book.objects.filter(title='plant 2').update(title='Planet')
+        self.assertEqual(self.complete(term='Plant', mf='1'), ['plant 0', 'plant 1'])
+        self.assertEqual(self.complete(term='an', mf='3'), ['ann'])
+        self.assertEqual(self.complete(term='pl%', mf='1'), [])
+
+    def test_no_suggestions(self):
+        create_books([1])
+        self.assertEqual(self.complete(term='p', mf='1'), [])
+        for mf in ('-1', '5', 'title', ''):
+            self.assertEqual(self.complete(term='plant', mf=mf), [], mf)
+        off = type('NoAutocompleteBookAdmin', (MyAdmin,), {'autocomplete_limit': 0})(Book, admin.site)
+        self.assertEqual(self.complete(off, term='plant', mf='1'), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsyncSearchTests(ChangeListTestCase):
+    def test_wsgi_request_takes_the_sync_view(self):
+        create_books([1, 2])
+        model_admin = type('AsyncBookAdmin', (MyAdmin,), {
+            'async_search': True, 'concurrent_count': False,
+        })(Book, admin.site)
+        response = async_to_sync(model_admin.async_changelist_view)(self.get_request(q='plant', mf='1'))
+        cl = response.context_data['cl']
+        self.assertNotIsInstance(cl, AsyncSearchOnlyChangeList)
+        self.assertEqual(len(cl.result_list), 2)
+
+    def test_each_event_loop_has_a_pool_of_its_own(self):
+        async def get_pools():
+            return await async_db.get_pool(), await async_db.get_pool()
+
+        with mock.patch.object(async_db, 'psycopg'), \
+                mock.patch.object(async_db, 'AsyncConnectionPool', side_effect=lambda **kwargs: mock.AsyncMock()):
+            first, again = async_to_sync(get_pools)()
+            second, _ = async_to_sync(get_pools)()
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+
+
+class AllFieldsBookAdmin(MyAdmin):
+    all_fields_search = True
+
+
+class SearchFieldTests(ChangeListTestCase):
+    admin_class = AllFieldsBookAdmin
+
+    def test_search_field_must_exist(self):
+        for mf in ('-1', '5', 'title', '1.0'):
+            with self.assertRaises(IncorrectLookupParameters, msg=mf):
+                self.get_changelist(q='plant', mf=mf)
+        with self.assertRaises(IncorrectLookupParameters):
+            self.get_changelist(model_admin=MyAdmin(Book, admin.site), q='plant', mf=ALL_FIELDS)
+
+    def test_search_without_a_field_shows_nothing(self):
+        cl = self.get_changelist(q='plant')
+        self.assertIsNone(cl.lookup_field)
+        self.assertIsNone(cl.searched_data)
+        self.assertEqual(cl.page_sql, '')
+
+    def test_page_sql_and_params_pair_up(self):
+        for mf in ('0', '1', '2', '3', '4', ALL_FIELDS):
+            cl = self.get_changelist(q='42', mf=mf)
+            self.assertEqual(cl.page_sql.count('%s'), len(cl.page_params), mf)
+
+    def test_union_clause_skips_fields_the_value_does_not_fit(self):
+        cl = self.get_changelist(q='abc', mf=ALL_FIELDS)
+        self.assertEqual(cl.get_union_fields('abc'), ['title', 'author__name', 'description'])
+        self.assertEqual(cl.get_union_fields('42'), ['id', 'title', 'price', 'author__name', 'description'])
+        clause = cl.get_union_clause('abc')
+        self.assertTrue(clause.startswith('books_book.id IN (SELECT books_book.id FROM books_book WHERE '))
+        self.assertEqual(clause.count(' UNION '), 2)
+        self.assertEqual(clause.count('%s'), len(cl.get_where_params('abc')))
+
+    def test_union_clause_without_fitting_field_matches_nothing(self):
+        model_admin = type('NumberAdmin', (AllFieldsBookAdmin,), {'search_fields': ['id', 'price']})
+        cl = self.get_changelist(model_admin=model_admin(Book, admin.site), q='abc', mf=ALL_FIELDS)
+        self.assertEqual(cl.get_union_clause('abc'), 'FALSE ')
+        self.assertEqual(cl.get_where_params('abc'), [])
+
+    def test_all_fields_search_matches_each_row_once(self):
+        books = create_books([42.5, 1])
+        Book.objects.filter(pk=books[0].pk).update(title='42.5 plants')
+        self.assertEqual([i.pk for i in self.get_changelist(q='42.5', mf=ALL_FIELDS).queryset], [books[0].pk])
+
+
+class FilteredBookAdmin(AllFieldsBookAdmin):
+    list_filter = ['author__name']
+
+
+class ListFilterTests(ChangeListTestCase):
+    admin_class = FilteredBookAdmin
+
+    def test_page_sql_and_params_pair_up(self):
+        for params in ({'mf': ALL_FIELDS, 'author__name': 'Ann'}, {'mf': '2', 'price__gte': '10'}):
+            cl = self.get_changelist(q='42', **params)
+            self.assertEqual(cl.page_sql.count('%s'), len(cl.page_params), params)
+
+    def test_filter_on_a_local_field_stays_inline(self):
+        cl = self.get_changelist(q='plant', mf='1', price__gte='10')
+        self.assertIn('"books_book"."price" >= %s', cl.filter_sql)
+        self.assertEqual(len(cl.filter_sql_params), 1)
+        self.assertEqual(cl.filter_models, [])
+        self.assertTrue(cl.get_where_clause('plant').endswith(f'AND {cl.filter_sql} '))
+        self.assertEqual(cl.get_where_params('plant')[-1], cl.filter_sql_params[-1])
+
+    def test_filter_across_a_relation_is_a_semi_join(self):
+        cl = self.get_changelist(q='plant', mf='1', author__name='Ann')
+        self.assertTrue(cl.filter_sql.startswith('(books_book.id IN (SELECT '))
+        self.assertEqual(cl.filter_sql_params, ['Ann'])
+        self.assertEqual(cl.filter_sql.count('%s'), len(cl.filter_sql_params))
+        self.assertEqual(cl.filter_models, [Author])
+        self.assertIn(Author, cl.get_searched_related_models())
+
+    def test_cursor_of_another_filter_is_ignored(self):
+        cl = self.get_changelist(q='plant', mf='1')
+        cl.paginate_keyset([Book(pk=i, title=f'plant {i:02}') for i in range(1, cl.list_per_page + 2)])
+        self.assertIsNotNone(self.get_changelist(q='plant', mf='1', c=cl.next_cursor).cursor)
+        self.assertIsNone(self.get_changelist(q='plant', mf='1', author__name='Ann', c=cl.next_cursor).cursor)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_writes_to_a_filtered_model_outdate_the_caches(self):
+        # users are read by the filter alone
+        model_admin = type('UserFilterBookAdmin', (MyAdmin,), {
+            'search_fields': ['title'], 'list_filter': [('author__user__username', admin.AllValuesFieldListFilter)],
+        })
+        model_admin(Book, admin.site)
+        version = get_model_version(User)
+        self.user.save()
+        self.assertNotEqual(get_model_version(User), version)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExportTests(ChangeListTestCase):
+    def export(self, **params):
+        self.client.force_login(self.user)
+        return self.client.get(reverse('admin:books_book_export'), params)
+
+    def test_csv_is_streamed_batch_by_batch(self):
+        create_books([1, 2, 3])
+        with mock.patch.object(MyAdmin, 'export_batch_size', 2):
+            response = self.export(q='plant', mf='1')
+            chunks = [i.decode() for i in response.streaming_content]
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(len(chunks), 3)  # the header, then a chunk per batch
+        rows = list(csv.reader(''.join(chunks).splitlines()))
+        self.assertEqual(rows[0], [i.attname for i in Book._meta.concrete_fields])
+        self.assertEqual([i[1] for i in rows[1:]], ['plant 0', 'plant 1', 'plant 2'])
+
+    def test_jsonl_has_an_object_per_match(self):
+        create_books([1, 2, 3])
+        response = self.export(q='2', mf='2', format='jsonl')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(i)['title'] for i in lines], ['plant 1'])
+
+    def test_export_needs_a_search(self):
+        self.assertEqual(self.export().status_code, 400)
+        self.assertEqual(self.export(q='plant').status_code, 400)
+        self.assertEqual(self.export(q='plant', mf='1', format='xml').status_code, 400)
+
+    def test_incorrect_search_field_shows_the_invalid_setup_page(self):
+        response = self.export(q='plant', mf='-1')
+        self.assertTemplateUsed(response, 'admin/invalid_setup.html')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkTests(TransactionTestCase):
+    where, params = 'books_book.price >= %s', [0]
+
+    def test_batches_walk_the_matching_keys(self):
+        create_books([1, 2, 3, 4, 5])
+        progress = []
+        changed, batches = run_in_batches(
+            Book, 'UPDATE books_book SET price = price + %s', [10], self.where, self.params,
+            batch_size=2, on_batch=lambda *args: progress.append(args),
+        )
+        self.assertEqual((changed, batches), (5, 3))
+        self.assertEqual(progress, [(2, 2 / 5), (4, 4 / 5), (5, 1)])
+        self.assertEqual(sorted(Book.objects.values_list('price', flat=True)), [11, 12, 13, 14, 15])
+
+    def test_a_full_last_batch_ends_with_an_empty_one(self):
+        create_books([1, 2, 3, 4])
+        self.assertEqual(bulk_update(Book, Book._meta.get_field('price'), 7, self.where, self.params,
+                                     batch_size=2), (4, 2))
+        self.assertEqual(set(Book.objects.values_list('price', flat=True)), {7})
+
+    def test_sparse_matches_take_one_batch_each_batch_size(self):
+        books = create_books([1, 0, 0, 0, 1, 0, 1])
+        changed, batches = bulk_delete(Book, 'books_book.price > %s', [0], batch_size=2)
+        self.assertEqual((changed, batches), (3, 2))
+        self.assertEqual(set(Book.objects.values_list('pk', flat=True)),
+                         {i.pk for i in books if i.price == 0})
+
+    def test_nothing_matches(self):
+        create_books([1, 2])
+        self.assertEqual(bulk_delete(Book, 'books_book.price > %s', [100]), (0, 0))
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_referenced_model_cannot_be_deleted(self):
+        create_books([1])
+        with self.assertRaisesMessage(ValueError, 'books.Author is referenced by books.Book'):
+            bulk_delete(Author, 'books_author.id > %s', [0])
+        self.assertEqual(Author.objects.count(), 1)
+
+    def test_failed_batch_rolls_back_alone(self):
+        create_books([1, 2, 3, 4, 5])
+        progress = []
+        with self.assertRaises(DataError):
+            # the second batch divides by zero
+            run_in_batches(
+                Book, 'UPDATE books_book SET price = 1 / (price - %s)', [3], self.where, self.params,
+                batch_size=2, on_batch=lambda *args: progress.append(args),
+            )
+        self.assertEqual(progress, [(2, 2 / 5)])
+        self.assertEqual(sorted(Book.objects.values_list('price', flat=True)), [-1, -0.5, 3, 4, 5])
+
+    def test_every_batch_drops_the_cache(self):
+        create_books([1, 2, 3])
+        versions = [get_model_version(Book)]
+        run_in_batches(Book, 'UPDATE books_book SET price = %s', [0], self.where, self.params, batch_size=2,
+                       on_batch=lambda *args: versions.append(get_model_version(Book)))
+        versions.append(get_model_version(Book))
+        self.assertEqual(len(versions), 4)
+        self.assertEqual(len(set(versions)), 4)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkActionTests(TestCase):
+    def test_one_log_entry_for_the_whole_action(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        create_books([1, 2, 3, 4, 5])
+        model_admin = MyAdmin(Book, admin.site)
+        model_admin.bulk_batch_size = 2
+        changed = model_admin.run_bulk_action(
+            user.pk, {'operation': 'update', 'field': 'price', 'value': 10.0},
+            'books_book.price >= %s', [2], "title matching 'plant'",
+        )
+        self.assertEqual(changed, 4)
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.user, user)
+        self.assertEqual(entry.action_flag, CHANGE)
+        self.assertEqual(entry.change_message, "Set price to 10.0 on 4 rows with title matching 'plant'.")
+        self.assertIsNone(entry.object_id)
+
+    def test_incorrect_search_field_shows_the_invalid_setup_page(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        model_admin = type('BulkBookAdmin', (MyAdmin,), {'bulk_actions': True})(Book, admin.site)
+        request = RequestFactory().get('/admin/books/book/bulk/', {'q': 'plant', 'mf': '-1'})
+        request.user = user
+        self.assertEqual(model_admin.bulk_view(request).template_name, 'admin/invalid_setup.html')
+
+
+class JobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_job_is_started_once_the_transaction_commits(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = start_job('bulk_delete', Book, self.user, lambda on_progress: 0)
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.model, 'books.Book')
+        self.assertEqual(len(callbacks), 1)
+
+    def test_job_reports_its_progress_until_it_is_done(self):
+        job = Job.objects.create(kind='bulk_delete', model='books.Book', user=self.user)
+        seen = []
+
+        def func(count, on_progress):
+            seen.append(Job.objects.get(pk=job.pk).status)
+            on_progress(count // 2, 0.5)
+            seen.append(Job.objects.values_list('processed', 'progress').get(pk=job.pk))
+            return count
+
+        run_job(job.pk, func, (10,), {})
+        self.assertEqual(seen, [Job.RUNNING, (5, 0.5)])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.processed), (Job.DONE, 1, 10))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_keeps_the_error(self):
+        job = Job.objects.create(kind='bulk_delete', model='books.Book', user=self.user)
+
+        def func(on_progress):
+            raise ValueError('books.Author is referenced by books.Book')
+
+        with self.assertLogs('books.jobs', 'ERROR'):
+            run_job(job.pk, func, (), {})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.message), (Job.FAILED, 'books.Author is referenced by books.Book'))
+        self.assertFalse(job.active)
+
+    @override_settings(BIGRECORD_JOB_STALE_AFTER=60)
+    def test_stale_job_is_listed_until_its_last_report_is_old(self):
+        job = Job.objects.create(kind='bulk_delete', model='books.Book', user=self.user, status=Job.RUNNING)
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=2))
+        job.refresh_from_db()
+        self.assertTrue(job.stale)
+        self.assertTrue(job.as_dict()['stale'])
+        self.assertEqual(get_recent_jobs(Book, self.user), [job])
+
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=20))
+        self.assertEqual(get_recent_jobs(Book, self.user), [])
@@ -1,13 +1,20 @@
 import csv
+import functools
+import json
 import re
 import random
-import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
 from django.contrib.auth.models import User
-from django.db import models
-from typing import Any, Callable, Union, Sequence
-import xxhash
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models, transaction
+from django.db.models.constants import LOOKUP_SEP
+from typing import Any, Callable, Iterator, Union, Sequence
 from faker import Faker
-from .models import Book
+from .models import Author, Book
 from model_bakery import baker
 
 
@@ -37,11 +44,18 @@ def get_field_verbose_names(model: models.Model) -> list[str]:
     return [field.verbose_name for field in model._meta.get_fields()]
 
 
-def generate_random_string():
-    x = xxhash.xxh64()
-    data = f"Hello, World!{time.time()}".encode()
-    x.update(data)
-    return x.hexdigest()
+def generate_random_string(rng: random.Random = random) -> str:
+    """
+    returns 16 random hex digits. Unlike a hash of the current time, it does not
+    repeat itself inside a tight loop, and a seeded `rng` makes it reproducible.
+    """
+    return f'{rng.getrandbits(64):016x}'
+
+
+@functools.lru_cache(maxsize=None)
+def get_faker() -> Faker:
+    """returns the Faker of this process; making one costs more than a fake row"""
+    return Faker('en_US')
 
 
 def get_fields(model: models.Model):
@@ -73,6 +87,176 @@ def get_sql_queryparams(model: models.Model, lookup_dict: dict, delim='AND') ->
     return ''.join(q)
 
 
+def get_search_expression(column: str, table: str = '') -> str:
+    """
+    returns the SQL expression that a column is searched on.
+    The trigram indexes are created on this very expression (without the table prefix),
+    and postgres only uses an expression index for a predicate that repeats it exactly,
+    so every search predicate and every index must take it from here.
+
+    example:
+    ```
+    >>> get_search_expression('title', 'books_book')
+    >>> 'LOWER(books_book.title::text)'
+    ```
+    """
+    column = f'{table}.{column}' if table else column
+    return f"LOWER({column}::text)"
+
+
+def get_search_kind(field: models.Field) -> str:
+    """
+    returns how a field is searched: `integer` (equality), `number` and `date`
+    (ranges) or `text` (matched on its `::text` form).
+    """
+    if isinstance(field, models.IntegerField):  # including the auto fields
+        return 'integer'
+    if isinstance(field, (models.FloatField, models.DecimalField)):
+        return 'number'
+    if isinstance(field, models.DateField):  # including DateTimeField
+        return 'date'
+    return 'text'
+
+
+def parse_number_range(value: str) -> Union[tuple[Decimal, Decimal], None]:
+    """
+    returns the range of the numbers that `value` stands for at the precision it is typed
+    with, or None if it is no number. The range is closed at the typed number and open at
+    its other end, which lies away from zero: `42` stands for [42, 43) and `-42` for (-43, -42].
+
+    example:
+    ```
+    >>> parse_number_range('42')
+    >>> (Decimal('42'), Decimal('43'))
+    >>> parse_number_range('42.5')
+    >>> (Decimal('42.5'), Decimal('42.6'))
+    >>> parse_number_range('-42')
+    >>> (Decimal('-43'), Decimal('-42'))
+    ```
+    """
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        return None
+    if not number.is_finite():
+        return None
+    step = Decimal(1).scaleb(number.as_tuple().exponent)
+    if number.is_signed():
+        return number - step, number
+    return number, number + step
+
+
+def parse_date_range(value: str) -> Union[tuple[date, date], None]:
+    """
+    returns the half-open range of the days that `value` stands for, or None if it is no date.
+    A year (`2023`), a month (`2023-09`) or a day (`2023-09-18`) can be searched.
+    """
+    value = value.strip()
+    for fmt in ('%Y-%m-%d', '%Y-%m', '%Y'):
+        try:
+            start = datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+        try:
+            if fmt == '%Y-%m-%d':
+                end = start + timedelta(days=1)
+            elif fmt == '%Y-%m':
+                end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            else:
+                end = start.replace(year=start.year + 1)
+        except (ValueError, OverflowError):
+            return None
+        return start, end
+    return None
+
+
+def escape_like(value: str) -> str:
+    """escapes the wildcards of a `LIKE` pattern, so `50%` is searched literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def get_lookup_path(model: models.Model, lookup: str) -> tuple[list, models.Field]:
+    """
+    resolves a lookup that spans relations, like `author__name`, through the `_meta`
+    of the models. returns the `PathInfo`s to walk (two per many-to-many relation)
+    and the field at the end of the path.
+    """
+    *relations, field_name = lookup.split(LOOKUP_SEP)
+    opts = model._meta
+    paths = []
+    for name in relations:
+        path_infos = opts.get_field(name).path_infos
+        paths.extend(path_infos)
+        opts = path_infos[-1].to_opts
+    return paths, opts.get_field(field_name)
+
+
+def get_related_models(model: models.Model, lookup: str) -> list:
+    """
+    returns the models that a lookup passes through, without `model` itself
+    """
+    if LOOKUP_SEP not in lookup:
+        return []
+    paths, _ = get_lookup_path(model, lookup)
+    return [path.to_opts.model for path in paths]
+
+
+def get_search_vector_column(column: str) -> str:
+    """returns the name of the generated `tsvector` column of a full text search field"""
+    return f'{column}_tsv'
+
+
+def search_vector_operations(table: str, columns: Sequence, config: str = 'english') -> list:
+    """
+    returns the migration operations that add a generated `tsvector` column for each column,
+    which the `fulltext` match mode searches on. Its GIN index is created by
+    `search_vector_index_operations` in a migration of its own.
+    `config` must be the `fulltext_config` of the model admin.
+
+    Adding a `STORED` generated column rewrites the whole table under an `ACCESS EXCLUSIVE`
+    lock, which blocks reads and writes for as long as that takes on a big table, so run it
+    in a maintenance window.
+
+    example:
+    ```
+    class Migration(migrations.Migration):
+        operations = [*search_vector_operations('books_book', ['description'])]
+    ```
+    """
+    operations = []
+    for column in columns:
+        vector = get_search_vector_column(column)
+        operations.append(migrations.RunSQL(
+            sql=f"ALTER TABLE {table} ADD COLUMN {vector} tsvector GENERATED ALWAYS AS "
+                f"(to_tsvector('{config}', coalesce({column}::text, ''))) STORED",
+            reverse_sql=f"ALTER TABLE {table} DROP COLUMN IF EXISTS {vector}",
+        ))
+    return operations
+
+
+def search_vector_index_operations(table: str, columns: Sequence) -> list:
+    """
+    returns the migration operations that build the GIN index of the `tsvector` column of each
+    column with `CREATE INDEX CONCURRENTLY`, which does not block writes to the table while
+    it builds. It cannot run in a transaction, so the migration must set `atomic = False`.
+
+    example:
+    ```
+    class Migration(migrations.Migration):
+        atomic = False
+        operations = [*search_vector_index_operations('books_book', ['description'])]
+    ```
+    """
+    operations = []
+    for column in columns:
+        vector = get_search_vector_column(column)
+        operations.append(migrations.RunSQL(
+            sql=f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{vector}_gin ON {table} USING gin ({vector})",
+            reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {table}_{vector}_gin",
+        ))
+    return operations
+
+
 def get_sql_searchparams(model: models.Model, search_fields: Sequence, search_param: Any, delim: str = 'AND') -> str:
     """
     This function is intended to be used for creating a query for searchnig in a model.
@@ -90,7 +274,7 @@ def get_sql_searchparams(model: models.Model, search_fields: Sequence, search_pa
     ```
     """
     table = model._meta.db_table
-    q = [f"LOWER({table}.{i}::text) LIKE LOWER(%s::text) " for i in search_fields]
+    q = [f"{get_search_expression(i, table)} LIKE LOWER(%s::text) " for i in search_fields]
     # Using LIKE was more efficient than ILIKE in the tests
     # Use of lowercasing along with  `LIKE` was a more efficient way than using `ILIKE`
     length = len(q)
@@ -100,6 +284,68 @@ def get_sql_searchparams(model: models.Model, search_fields: Sequence, search_pa
     return ''.join(q)
 
 
+class CursorSerializer(signing.JSONSerializer):
+    """
+    lets dates and decimals of a sort key travel inside a cursor.
+    They come back as strings, which postgres casts to the column type again.
+    """
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=DjangoJSONEncoder).encode("latin-1")
+
+
+def encode_cursor(payload: dict) -> str:
+    """
+    returns an opaque, url-safe token for a keyset pagination cursor.
+    The token is signed so a tampered cursor is rejected instead of being
+    turned into a query.
+    """
+    return signing.dumps(payload, salt='books.cursor', serializer=CursorSerializer)
+
+
+def decode_cursor(token: str) -> Union[dict, None]:
+    try:
+        return signing.loads(token, salt='books.cursor', serializer=CursorSerializer)
+    except signing.BadSignature:
+        return None
+
+
+@contextmanager
+def statement_timeout(milliseconds: Union[int, None], using: str = DEFAULT_DB_ALIAS):
+    """
+    runs the block in a transaction whose statements postgres cancels after `milliseconds`.
+    `SET LOCAL` ends with the transaction, so the connection is left as it was.
+    Inside an outer transaction the block runs in a savepoint, whose release keeps the
+    setting until the outer transaction ends, so the previous value is restored after
+    the block. A failed block rolls the savepoint, and the setting with it, back.
+    A falsy `milliseconds` runs the block without a limit.
+    """
+    if not milliseconds:
+        yield
+        return
+    connection = connections[using]
+    nested, previous = connection.in_atomic_block, None
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            if nested:
+                cursor.execute("SELECT current_setting('statement_timeout')")
+                previous = cursor.fetchone()[0]
+            cursor.execute("SET LOCAL statement_timeout = %s", [int(milliseconds)])
+        yield
+        if previous is not None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [previous])
+
+
+def is_query_canceled(error: Exception) -> bool:
+    """
+    tells whether a database error is the cancellation of a statement by `statement_timeout`
+    (SQLSTATE 57014, `query_canceled`)
+    """
+    cause = error.__cause__
+    return getattr(cause, 'pgcode', None) == '57014' or getattr(cause, 'sqlstate', None) == '57014'
+
+
 def get_sql_ordering(fields: dict[str, str]):
     args = [f" {i} {fields[i]}" for i in fields]
     for i in range(len(args)-1):
@@ -132,7 +378,7 @@ class FakeModelFactory:
 
 
 def fake_creator() -> dict[str, Any]:
-    faker = Faker('en_US')
+    faker = get_faker()
     DATE = faker.date()
     return {
         'title': generate_random_string(),
@@ -144,7 +390,7 @@ def fake_creator() -> dict[str, Any]:
 
 
 def fake_list_creator(ID) -> list:
-    faker = Faker('en_US')
+    faker = get_faker()
     DATE = faker.date()
     return [
         ID,
@@ -165,19 +411,94 @@ def create_header_row(model):
     return ', '.join(field_names)
 
 
-def create_fake_csv(model, number):
-    last_id = model.objects.last().id
-    data_row = (fake_list_creator(_id)
-                for _id in range(last_id+1, number+last_id))
+def sample_ids(model: models.Model, limit: int = 10000) -> list:
+    """
+    returns up to `limit` primary keys of a model, for fake rows to reference
+    """
+    ids = list(model.objects.order_by('pk').values_list('pk', flat=True)[:limit])
+    if not ids:
+        raise ValueError(f"{model._meta.label} has no rows to reference")
+    return ids
+
+
+FIRST_FAKE_DAY = date(1900, 1, 1).toordinal()
+LAST_FAKE_DAY = date(2023, 12, 31).toordinal()
 
-    with open('fake_books.csv', 'w') as f:
-        csv_writer = csv.writer(f)
-        header_row = create_header_row(model)
 
-        csv_writer.writerow(header_row)
+class FakeRowFactory:
+    """
+    Generates fake rows for `Author` or `Book`, ready for `loader.copy_rows`.
+    The rows reference existing users/authors.
+
+    model: the model to generate rows for
+    seed: makes the rows reproducible. Chunks are seeded on their own (see `rows`),
+          so the same chunk gets the same rows in whatever process it is made.
 
-        for r in data_row:
-            csv_writer.writerow(r)
+    Faker is slow, so the long texts are drawn from pools made once per factory
+    instead of once per row; make one factory per process and reuse it.
+    """
+    pool_size = 1000
+
+    def __init__(self, model: models.Model, seed: Union[int, None] = None):
+        self.model = model
+        self.seed = seed
+        self.random = random.Random(seed)
+        faker = Faker('en_US')
+        faker.seed_instance(seed)
+
+        if model is Author:
+            self.columns = ['user_id', 'name']
+            self.reference_ids = sample_ids(User)
+            self.pool = [faker.name()[:32] for _ in range(self.pool_size)]
+        elif model is Book:
+            self.columns = ['title', 'publication_date', 'price', 'serial_number', 'description', 'author_id']
+            self.reference_ids = sample_ids(Author)
+            self.pool = [faker.text(self.random.randint(10, 100)) for _ in range(self.pool_size)]
+        else:
+            raise ValueError(f"no fake rows for {model._meta.label}")
+
+    def make_row(self, rng: random.Random) -> tuple:
+        if self.model is Author:
+            return rng.choice(self.reference_ids), rng.choice(self.pool)
+        return (
+            generate_random_string(rng),
+            date.fromordinal(rng.randint(FIRST_FAKE_DAY, LAST_FAKE_DAY)),
+            rng.randint(10, 10000),
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            rng.choice(self.pool),
+            rng.choice(self.reference_ids),
+        )
+
+    def rows(self, how_many: int, chunk: Union[int, None] = None) -> Iterator[tuple]:
+        """
+        param `how_many`: number of rows to generate
+        param `chunk`: index of the chunk the rows are made for; with a seed it
+                     picks the random sequence of that chunk
+        """
+        rng = self.random
+        if self.seed is not None and chunk is not None:
+            rng = random.Random(f'{self.seed}-{chunk}')
+        return (self.make_row(rng) for _ in range(how_many))
+
+
+def fake_rows(model: models.Model, how_many: int) -> tuple[list[str], Iterator[tuple]]:
+    """
+    returns the field names and a generator of `how_many` fake rows for `Author` or `Book`
+    """
+    factory = FakeRowFactory(model)
+    return factory.columns, factory.rows(how_many)
+
+
+def create_fake_csv(model, number, path='fake_books.csv'):
+    """
+    writes `number` fake rows of `model` with a header row into a CSV file,
+    which the `load_records` command can load.
+    """
+    header, rows = fake_rows(model, number)
+    with open(path, 'w', newline='') as f:
+        csv_writer = csv.writer(f)
+        csv_writer.writerow(header)
+        csv_writer.writerows(rows)
 
 
 def fake_field_creator(how_many=100):
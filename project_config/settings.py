@@ -61,6 +61,7 @@ DEBUG_TOOLBAR_PANELS = [
     'debug_toolbar.panels.signals.SignalsPanel',
     'debug_toolbar.panels.logging.LoggingPanel',
     'debug_toolbar.panels.redirects.RedirectsPanel',
+    'books.panels.SearchPanel',
 ]
 
 ROOT_URLCONF = 'project_config.urls'
@@ -105,6 +106,14 @@ DATABASES = {
     }
 }
 
+# The search caches are only invalidated in every process when they share a cache backend
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://localhost:6379',
+#     }
+# }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators